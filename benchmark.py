@@ -0,0 +1,348 @@
+# benchmark.py - Performance checks for the PC assistant
+#
+# Usage: python benchmark.py [storage] [archive] [email] [mailboxes] [search] [context] [processes]
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import psutil
+
+sys.path.append('src')
+
+from tools.storage import Storage
+from tools.metrics_archive import MetricsArchive
+from tools.email_checker import EmailChecker
+from tools.email_cache import EmailCache
+from tools.email_coordinator import EmailFetchCoordinator
+from tools.email_index import EmailIndex
+from tools.trend_context import build_trend_context, estimate_tokens
+from tools.process_monitor import ProcessCollector
+from imap_standin import StandinServer, Mailbox, make_message
+
+
+def timed(func, repeat=5):
+    """Run func a few times and return (best seconds, result)"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def write_fake_history(filename, count, start=datetime(2024, 1, 1)):
+    """Write COUNT history entries, one minute apart"""
+    with open(filename, 'w', encoding='utf-8') as f:
+        for i in range(count):
+            entry = {
+                'timestamp': (start + timedelta(minutes=i)).isoformat(),
+                'type': 'system',
+                'report': f"CPU Usage: {i % 100}%",
+                'analysis': "Status: Good",
+                'metrics': {'cpu_percent': i % 100, 'mem_percent': 50.0, 'disk_percent': 70.0}
+            }
+            f.write(json.dumps(entry) + "\n")
+    return start + timedelta(minutes=count - 1)
+
+
+def bench_storage():
+    """get_recent / get_range latency as history grows"""
+    print("\n" + "="*60)
+    print("Storage: tail reads vs full parse")
+    print("="*60 + "\n")
+
+    with tempfile.TemporaryDirectory() as folder:
+        for count in (100_000, 1_000_000):
+            filename = os.path.join(folder, f"history_{count}.jsonl")
+            last = write_fake_history(filename, count)
+            storage = Storage(filename=filename, legacy_filename=None)
+            size_mb = os.path.getsize(filename) / 1e6
+
+            recent_s, recent = timed(lambda: storage.get_recent(10))
+            range_s, hour = timed(lambda: storage.get_range(last - timedelta(hours=1), last))
+            full_s, _ = timed(storage.load_history, repeat=1)
+
+            print(f"{count:>9,} entries ({size_mb:.0f} MB)")
+            print(f"   get_recent(10):     {recent_s * 1000:8.2f} ms  ({len(recent)} entries)")
+            print(f"   get_range(1 hour):  {range_s * 1000:8.2f} ms  ({len(hour)} entries)")
+            print(f"   load_history():     {full_s * 1000:8.2f} ms  (full parse)\n")
+
+
+def bench_archive(count=1_000_000):
+    """Parquet archive vs JSON history for a p95 CPU query"""
+    print("\n" + "="*60)
+    print(f"Metrics archive: {count:,} samples, p95 CPU over 30 days")
+    print("="*60 + "\n")
+
+    now = time.time()
+    timestamps = now - np.arange(count)[::-1] * (30 * 86400 / count)
+    cpu = (np.sin(np.arange(count) / 500) + 1) * 50
+
+    with tempfile.TemporaryDirectory() as folder:
+        # JSON history holding the same samples as entry metrics
+        json_name = os.path.join(folder, "history.jsonl")
+        with open(json_name, 'w') as f:
+            for ts, value in zip(timestamps.tolist(), cpu.tolist()):
+                entry = {
+                    'timestamp': datetime.fromtimestamp(ts).isoformat(),
+                    'type': 'system',
+                    'metrics': {'timestamp': ts, 'cpu_percent': value,
+                                'mem_percent': 50.0, 'disk_percent': 70.0}
+                }
+                f.write(json.dumps(entry) + "\n")
+
+        archive = MetricsArchive(root=os.path.join(folder, "metrics"), batch_size=count + 1)
+        for ts, value in zip(timestamps.tolist(), cpu.tolist()):
+            archive.append({'timestamp': ts, 'cpu_percent': value,
+                            'mem_percent': 50.0, 'disk_percent': 70.0})
+        archive.flush()
+
+        def json_p95():
+            storage = Storage(filename=json_name, legacy_filename=None)
+            values = [entry['metrics']['cpu_percent'] for entry in storage.load_history()]
+            return float(np.percentile(values, 95))
+
+        json_size = os.path.getsize(json_name)
+        archive_size = sum(
+            os.path.getsize(os.path.join(root, name))
+            for root, _, names in os.walk(archive.root) for name in names
+        )
+
+        json_s, json_value = timed(json_p95, repeat=1)
+        archive_s, archive_value = timed(lambda: archive.percentile('cpu_percent', 95, days=30))
+
+        print(f"   JSON history:    {json_size / 1e6:8.1f} MB   p95 in {json_s * 1000:9.1f} ms  ({json_value:.2f}%)")
+        print(f"   Parquet archive: {archive_size / 1e6:8.1f} MB   p95 in {archive_s * 1000:9.1f} ms  ({archive_value:.2f}%)\n")
+
+
+def fetch_full_messages(checker, num_emails):
+    """Old get_recent_emails: one RFC822 FETCH per message"""
+    checker.mail.select("INBOX")
+    _, message_numbers = checker.mail.search(None, "ALL")
+    emails = []
+    for email_id in reversed(message_numbers[0].split()[-num_emails:]):
+        _, msg_data = checker.mail.fetch(email_id, "(RFC822)")
+        emails.append(msg_data[0][1])
+    return emails
+
+
+def bench_email(num_emails=20):
+    """Header-only batched FETCH vs full RFC822 fetches"""
+    print("\n" + "="*60)
+    print(f"Email: fetch {num_emails} newest messages (2 ms RTT, 50 MB/s)")
+    print("="*60 + "\n")
+
+    for attachment in (0, 1_000_000, 5_000_000):
+        inbox = Mailbox(make_message(i, attachment) for i in range(num_emails))
+        server = StandinServer({"INBOX": inbox}, latency=0.002, bandwidth=50_000_000).start()
+        checker = EmailChecker("bench@example.com", "x", "127.0.0.1", port=server.port,
+                               use_ssl=False, cache=False, index=False)
+        checker.connect()
+
+        folder = tempfile.mkdtemp()
+        cached = EmailChecker("bench@example.com", "x", "127.0.0.1", port=server.port, use_ssl=False,
+                              cache=EmailCache(filename=os.path.join(folder, "cache.json")), index=False)
+        cached.get_recent_emails(num_emails)
+
+        results = []
+        for name, fetch in (("RFC822 per message", lambda: fetch_full_messages(checker, num_emails)),
+                            ("batched headers", lambda: checker.get_recent_emails(num_emails)),
+                            ("incremental (cached)", lambda: cached.get_recent_emails(num_emails))):
+            sent_before = server.bytes_sent
+            seconds, emails = timed(fetch, repeat=3)
+            sent = (server.bytes_sent - sent_before) / 3
+            results.append((name, seconds, sent, len(emails)))
+
+        print(f"Attachment size {attachment / 1e6:.0f} MB")
+        for name, seconds, sent, count in results:
+            print(f"   {name:<20} {seconds * 1000:8.1f} ms  {sent / 1e6:8.2f} MB sent  ({count} emails)")
+        print()
+
+        checker.disconnect()
+        cached.disconnect()
+        shutil.rmtree(folder)
+        server.shutdown()
+        server.server_close()
+
+
+def bench_mailboxes(num_emails=10, latency=0.02):
+    """Sequential vs concurrent fetch of several accounts and folders"""
+    folders = ["INBOX", "Work", "alerts"]
+    servers = [
+        StandinServer({name: Mailbox(make_message(i) for i in range(50)) for name in folders},
+                      latency=latency).start()
+        for _ in range(2)
+    ]
+    accounts = [
+        {'address': f"user{i}@example.com", 'password': "x", 'server': "127.0.0.1",
+         'port': server.port, 'use_ssl': False, 'folders': folders}
+        for i, server in enumerate(servers)
+    ]
+
+    print("\n" + "="*60)
+    print(f"Mailboxes: {len(accounts)} accounts x {len(folders)} folders, "
+          f"{num_emails} emails each ({latency * 1000:.0f} ms RTT)")
+    print("="*60 + "\n")
+
+    def sequential():
+        emails = []
+        for account in accounts:
+            checker = EmailChecker(account['address'], "x", "127.0.0.1", port=account['port'],
+                                   use_ssl=False, cache=False, index=False)
+            for folder in folders:
+                emails.extend(checker.get_recent_emails(num_emails, folder))
+        return emails
+
+    coordinator = EmailFetchCoordinator(accounts, cache=False, index=False)
+
+    # Log in once first, so both sides measure warm connections
+    sequential()
+    coordinator.fetch_recent(num_emails)
+
+    sequential_s, emails = timed(sequential, repeat=3)
+    concurrent_s, merged = timed(lambda: coordinator.fetch_recent(num_emails), repeat=3)
+    slowest = max(coordinator.last_timings.values())
+
+    print(f"   sequential:          {sequential_s * 1000:8.1f} ms  ({len(emails)} emails)")
+    print(f"   coordinator:         {concurrent_s * 1000:8.1f} ms  ({len(merged)} emails, merged)")
+    print(f"   slowest folder:      {slowest * 1000:8.1f} ms\n")
+
+    coordinator.disconnect()
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def bench_search(count=100_000):
+    """Full-text index queries vs scanning the email dicts"""
+    print("\n" + "="*60)
+    print(f"Email search: {count:,} indexed messages")
+    print("="*60 + "\n")
+
+    # Zipf-like vocabulary, so a few words are in most messages and most words are rare
+    rng = np.random.default_rng(0)
+    vocabulary = np.array([f"word{i}" for i in range(5000)])
+    weights = 1 / np.arange(1, vocabulary.size + 1)
+    words = rng.choice(vocabulary, size=(count, 30), p=weights / weights.sum()).tolist()
+
+    start = time.time() - count * 60
+    emails = [
+        {
+            'account': "me@example.com", 'folder': "INBOX", 'uid': i + 1,
+            'timestamp': start + i * 60, 'date': "",
+            'subject': " ".join(picked[:5]),
+            'from': f"sender{i % 500}@example{i % 7}.com",
+            'body_preview': " ".join(picked[5:])
+        }
+        for i, picked in enumerate(words)
+    ]
+
+    with tempfile.TemporaryDirectory() as folder:
+        index = EmailIndex(filename=os.path.join(folder, "email_index.db"))
+        index_s, _ = timed(lambda: index.add(emails), repeat=1)
+        size_mb = os.path.getsize(index.filename) / 1e6
+
+        def scan(word):
+            hits = [e for e in emails if word in e['subject'].split() or word in e['body_preview'].split()]
+            return sorted(hits, key=lambda e: e['timestamp'], reverse=True)[:20]
+
+        week_ago = time.time() - 7 * 86400
+        queries = (
+            ("rare keyword", lambda: index.search("word3000")),
+            ("common keyword", lambda: index.search("word1")),
+            ("two keywords", lambda: index.search("word40 word41")),
+            ("prefix 'word499*'", lambda: index.search("word499*")),
+            ("sender", lambda: index.search(sender="sender42@")),
+            ("keyword + last week", lambda: index.search("word40", start=week_ago)),
+            ("linear scan", lambda: scan("word3000"))
+        )
+
+        print(f"   build index:         {index_s * 1000:8.0f} ms  ({size_mb:.0f} MB)")
+        for name, query in queries:
+            seconds, results = timed(query)
+            print(f"   {name:<20} {seconds * 1000:8.2f} ms  ({len(results)} results)")
+        print()
+
+        index.connection().close()
+
+
+def bench_context():
+    """Trend context size and build time as history grows"""
+    print("\n" + "="*60)
+    print("Trend context: prompt size vs stored checks")
+    print("="*60 + "\n")
+
+    now = datetime.now()
+    with tempfile.TemporaryDirectory() as folder:
+        for count in (10, 100_000, 1_000_000):
+            filename = os.path.join(folder, f"history_{count}.jsonl")
+            write_fake_history(filename, count, start=now - timedelta(minutes=count))
+            storage = Storage(filename=filename, legacy_filename=None)
+            storage.compact(now)  # what the background compaction does over time
+
+            seconds, context = timed(lambda: build_trend_context(storage, now=now))
+            print(f"{count:>9,} checks   {seconds * 1000:8.1f} ms   ~{estimate_tokens(context)} tokens")
+        print()
+
+
+
+def bench_processes(extra=1000):
+    """Top-N collector cost with many processes vs per-process blocking reads"""
+    print("\n" + "="*60)
+    print(f"Process collector: top-N with {extra:,} extra processes")
+    print("="*60 + "\n")
+
+    # Old way: Process.cpu_percent(interval) sleeps once per process
+    sample = list(psutil.process_iter())[:10]
+    start = time.perf_counter()
+    for proc in sample:
+        try:
+            proc.cpu_percent(interval=0.05)
+        except psutil.Error:
+            pass
+    blocking = (time.perf_counter() - start) / len(sample)
+
+    children = [subprocess.Popen(["sleep", "300"]) for _ in range(extra)]
+    try:
+        collector = ProcessCollector()
+        collector.collect()  # first pass creates the Process objects
+        seconds, top = timed(collector.collect)
+        count = top['count']
+
+        print(f"Blocking cpu_percent(0.05): {blocking * count:8.2f} s    ({count:,} processes, estimated)")
+        print(f"collect():                  {seconds * 1000:8.2f} ms   ({seconds / count * 1e6:.1f} µs per process)")
+        print(f"   at one pass every {collector.interval:g}s: {seconds / collector.interval * 100:.2f}% of one core")
+    finally:
+        for child in children:
+            child.kill()
+            child.wait()
+
+    collector.collect()
+    print(f"Tracked after the extra processes exit: {collector.tracked():,} (was {count:,})\n")
+
+
+BENCHMARKS = {
+    'storage': bench_storage,
+    'archive': bench_archive,
+    'email': bench_email,
+    'mailboxes': bench_mailboxes,
+    'search': bench_search,
+    'context': bench_context,
+    'processes': bench_processes
+}
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        BENCHMARKS[name]()
+
+    print("✅ Benchmarks complete!\n")
@@ -1,12 +1,20 @@
 # dashboard_v2.py - Enhanced Dashboard with Tabs and History
 
 import streamlit as st
-from openai import OpenAI
+import pandas as pd
 import sys
+from datetime import datetime, timedelta
 sys.path.append('src')
 
-from tools.system_monitor import get_system_report
+from tools.system_monitor import get_snapshot, get_top_processes, format_report, format_rate, get_sampler
 from tools.storage import Storage
+from tools.metrics_archive import get_archive
+from tools.email_coordinator import EmailFetchCoordinator
+from tools.email_index import get_email_index
+from tools.llm_service import get_analysis_service, SYSTEM_PARAMS
+from tools.trend_context import build_trend_context
+from tools.visualizer import create_gauge_chart, create_timeseries_chart
+from tools.anomaly_detector import get_anomaly_watcher
 from config import Config
 
 # Page config
@@ -32,23 +40,111 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Initialize AI client
+# Initialize AI service (shared by every browser session)
 @st.cache_resource
 def get_ai():
-    return OpenAI(
-        base_url=Config.LLM_BASE_URL,
-        api_key="not-needed"
-    )
+    return get_analysis_service()
 
-client = get_ai()
+ai = get_ai()
+llm_cache = ai.cache
 
 # Initialize storage
 @st.cache_resource
 def get_storage():
-    return Storage()
+    archive = get_archive() if Config.ARCHIVE_ENABLED else None
+    return Storage(archive=archive)
 
 storage = get_storage()
 
+# Start the background metrics sampler once per process
+@st.cache_resource
+def get_monitor():
+    sampler = get_sampler()
+    if Config.ARCHIVE_ENABLED:
+        sampler.add_listener(get_archive().append)
+    return sampler
+
+monitor = get_monitor()
+
+# Anomaly watcher: learns each metric's normal level from every sample, asks the AI only when it breaks
+@st.cache_resource
+def get_watcher():
+    if not Config.ANOMALY_ENABLED:
+        return None
+    watcher = get_anomaly_watcher(storage, archive=get_archive() if Config.ARCHIVE_ENABLED else None)
+    monitor.add_listener(watcher.on_reading)
+    return watcher
+
+watcher = get_watcher()
+
+# Live panel: reruns on its own every few seconds, reading only the sampler's buffer
+@st.fragment(run_every=Config.LIVE_REFRESH_SECONDS)
+def live_panel():
+    readings = monitor.history()[-Config.LIVE_CHART_POINTS:]
+    if not readings:
+        st.caption("⏳ Waiting for the first reading...")
+        return
+    
+    latest = readings[-1]
+    previous = readings[-2] if len(readings) > 1 else latest
+    
+    metrics = (("CPU", 'cpu_percent'), ("Memory", 'mem_percent'), ("Disk", 'disk_percent'))
+    for column, (label, field) in zip(st.columns(3), metrics):
+        value = getattr(latest, field)
+        baseline = watcher.detector.baseline(field) if watcher else None
+        column.metric(label, f"{value:.1f}%", f"{value - getattr(previous, field):+.1f}", delta_color="inverse",
+                      help=f"Normal here: {baseline[0]:.1f} ± {baseline[1]:.1f}%" if baseline else None)
+    
+    if watcher:
+        anomalies = watcher.stats()
+        if anomalies['active']:
+            st.error(f"🚨 Unusual right now: {', '.join(anomalies['active'])} (see History → anomaly)")
+        else:
+            st.caption(f"✅ Readings within this PC's normal range · {anomalies['logged']} anomalies logged, "
+                       f"{anomalies['analyses']} analyzed by AI")
+    
+    chart = pd.DataFrame(
+        {
+            'CPU %': [r.cpu_percent for r in readings],
+            'Memory %': [r.mem_percent for r in readings]
+        },
+        index=[r.taken_at for r in readings]
+    )
+    st.line_chart(chart, height=200)
+
+# Metric series for the history chart (re-read at most once a minute per window)
+@st.cache_data(ttl=60, max_entries=8, show_spinner=False)
+def metric_series(days):
+    start = datetime.now() - timedelta(days=days)
+    if Config.ARCHIVE_ENABLED:
+        columns = ['timestamp', 'cpu_percent', 'mem_percent', 'disk_percent']
+        data = get_archive().scan(start, None, columns=columns, source="sampler")
+        if data['timestamp'].size:
+            return data
+    
+    # No archive: hourly/daily averages from the history rollups
+    points = storage.get_trend(start)
+    return {
+        'timestamp': [datetime.fromisoformat(point['timestamp']).timestamp() for point in points],
+        'cpu_percent': [point.get('cpu_percent', {}).get('avg') for point in points],
+        'mem_percent': [point.get('mem_percent', {}).get('avg') for point in points],
+        'disk_percent': [point.get('disk_percent', {}).get('avg') for point in points]
+    }
+
+# History pages/counts, cached per history-file signature (new entries change it)
+@st.cache_data(max_entries=64, show_spinner=False)
+def history_page(signature, page, page_size, analysis_type, start, end):
+    return storage.get_page(page, page_size, analysis_type, start, end)
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def history_count(signature, analysis_type=None, start=None, end=None):
+    return storage.count(analysis_type, start, end)
+
+# One set of mailbox connections per process
+@st.cache_resource
+def get_mail():
+    return EmailFetchCoordinator()
+
 # Sidebar
 with st.sidebar:
     st.header("⚙️ Settings")
@@ -60,11 +156,13 @@ with st.sidebar:
     st.markdown("---")
     
     st.subheader("📧 Email")
-    email_configured = Config.is_email_configured()
+    email_accounts = Config.get_email_accounts()
+    email_configured = bool(email_accounts)
     
     if email_configured:
         st.success("✅ Configured")
-        st.caption(f"📬 {Config.EMAIL_ADDRESS}")
+        for account in email_accounts:
+            st.caption(f"📬 {account['address']}")
     else:
         st.warning("⚠️ Not configured")
         with st.expander("How to configure"):
@@ -81,8 +179,16 @@ with st.sidebar:
     st.markdown("---")
     
     st.subheader("📊 Statistics")
-    history = storage.load_history()
-    st.metric("Total Checks", len(history))
+    st.metric("Total Checks", history_count(storage.backend.signature()))
+    llm_stats = llm_cache.stats()
+    st.caption(f"AI cache: {llm_stats['hit_rate']:.0%} hit rate, "
+               f"{llm_stats['saved_seconds']:.1f}s of LLM time saved")
+    rules = ai.classifier.stats()
+    st.caption(f"Fast path: {rules['bypassed']}/{rules['checked']} checks skipped the LLM "
+               f"({rules['bypass_rate']:.0%})")
+    ai_stats = ai.stats()
+    st.caption(f"AI requests: {ai_stats['in_flight']}/{ai_stats['max_concurrency']} running, "
+               f"{ai_stats['queued']} queued")
     
     if st.button("🗑️ Clear All History"):
         storage.clear_history()
@@ -99,12 +205,16 @@ st.markdown("Monitor your PC health and get AI-powered recommendations")
 st.markdown("---")
 
 # Create tabs
-tab1, tab2, tab3 = st.tabs(["💻 System Health", "📊 History", "ℹ️ About"])
+tab1, tab2, tab3, tab4 = st.tabs(["💻 System Health", "📊 History", "📧 Email", "ℹ️ About"])
 
 # ============================================================
 # TAB 1: SYSTEM HEALTH
 # ============================================================
 with tab1:
+    if st.toggle("📡 Live view", value=True, key="live_toggle"):
+        live_panel()
+        st.markdown("---")
+    
     col1, col2 = st.columns([1, 1])
     
     # LEFT COLUMN: System Status
@@ -113,12 +223,31 @@ with tab1:
         
         if st.button("🔄 Check System Now", key="check_btn"):
             with st.spinner("Checking system health..."):
-                report = get_system_report()
-                st.session_state['current_report'] = report
+                snapshot = get_snapshot()
+                st.session_state['current_snapshot'] = snapshot
+                st.session_state['current_report'] = format_report(snapshot, get_top_processes())
                 st.success("✅ System check complete!")
         
         # Display report if available
         if 'current_report' in st.session_state:
+            snapshot = st.session_state['current_snapshot']
+            gauges = (("CPU", snapshot.cpu_percent), ("Memory", snapshot.mem_percent), ("Disk", snapshot.disk_percent))
+            for column, (label, value) in zip(st.columns(3), gauges):
+                with column:
+                    st.plotly_chart(create_gauge_chart(value, label), key=f"gauge_{label}")
+
+            # Busiest core and throughput (rates need two readings, so they may be missing at first)
+            col_a, col_b, col_c = st.columns(3)
+            col_a.metric("Busiest Core", f"{snapshot.cpu_max_core}%" if snapshot.cpu_max_core is not None else "—",
+                         help=f"{len(snapshot.cpu_per_core)} cores")
+            if snapshot.disk_read_rate is not None:
+                col_b.metric("Disk I/O", format_rate(snapshot.disk_read_rate + snapshot.disk_write_rate),
+                             help=f"Read {format_rate(snapshot.disk_read_rate)}, write {format_rate(snapshot.disk_write_rate)}")
+                col_c.metric("Network", format_rate(snapshot.net_recv_rate + snapshot.net_sent_rate),
+                             help=f"Down {format_rate(snapshot.net_recv_rate)}, up {format_rate(snapshot.net_sent_rate)}")
+
+            if len(snapshot.partitions) > 1:
+                st.dataframe(pd.DataFrame(snapshot.partitions), hide_index=True)
             st.code(st.session_state['current_report'], language=None)
         else:
             st.info("👆 Click 'Check System Now' to see your PC health")
@@ -131,43 +260,60 @@ with tab1:
             if 'current_report' not in st.session_state:
                 st.warning("⚠️ Please check system first!")
             else:
-                with st.spinner("AI is analyzing your system..."):
-                    prompt = f"""Analyze this PC health report and provide recommendations:
-
-{st.session_state['current_report']}
-
-Please provide:
-1. **Status**: Good/Warning/Critical (one word)
-2. **Issues**: List any problems found (or "None")
-3. **Recommendation**: One specific action to take
-
-Be concise and actionable."""
-
-                    try:
-                        response = client.chat.completions.create(
-                            model="local-model",
-                            messages=[{"role": "user", "content": prompt}],
-                            temperature=0.7,
-                            max_tokens=250
-                        )
-                        
-                        analysis = response.choices[0].message.content
-                        
-                        # Display analysis
-                        st.markdown("### 📋 Analysis Result")
+                params = SYSTEM_PARAMS
+                
+                try:
+                    st.markdown("### 📋 Analysis Result")
+                    
+                    # Clearly healthy? Rules answer without asking the LLM
+                    verdict = ai.classifier.classify(st.session_state['current_snapshot'])
+                    llm_stats = None
+                    
+                    if verdict['needs_llm']:
+                        # History summary of fixed size, however many checks are stored (only the LLM reads it)
+                        context = build_trend_context(storage, archive=get_archive() if Config.ARCHIVE_ENABLED else None)
+                        messages = ai.system_messages(st.session_state['current_report'], context)
+                        key = llm_cache.make_key(ai.model, messages, **params)
+                        analysis = llm_cache.get(key)
+                    else:
+                        analysis = verdict['analysis']
+                    
+                    if not verdict['needs_llm']:
+                        llm_stats = {'fast_path': True}
                         st.info(analysis)
+                        st.caption("⚡ Fast path: all readings below the warning thresholds")
+                    elif analysis is not None:
+                        # Same report again? The cached answer comes back instantly
+                        st.info(analysis)
+                        st.caption("⚡ From cache")
+                    else:
+                        # Show tokens as they arrive (waits in line if other sessions are using the LLM)
+                        stream = ai.stream(messages, **params)
+                        with st.container(border=True):
+                            st.write_stream(stream)
                         
-                        # Save to history
-                        storage.save_analysis(
-                            "system",
-                            st.session_state['current_report'],
-                            analysis
-                        )
-                        st.success("💾 Saved to history!")
+                        analysis = stream.text
+                        llm_stats = stream.stats()
+                        llm_cache.put(key, analysis, llm_stats['total_seconds'])
                         
-                    except Exception as e:
-                        st.error(f"❌ Error: {e}")
-                        st.info("Make sure LM Studio server is running!")
+                        speed = llm_stats['tokens_per_second']
+                        st.caption(f"⏱️ First token {llm_stats['ttft_seconds']:.2f}s · "
+                                   f"{llm_stats['tokens']} tokens in {llm_stats['total_seconds']:.1f}s"
+                                   + (f" · {speed:.1f} tokens/s" if speed else ""))
+                    
+                    # Save to history (only once the full answer is in)
+                    storage.save_analysis(
+                        "system",
+                        st.session_state['current_report'],
+                        analysis,
+                        metrics=st.session_state['current_snapshot'].to_dict(),
+                        llm=llm_stats
+                    )
+                    st.success("💾 Saved to history!")
+                    
+                except Exception as e:
+                    st.error(f"❌ Error: {e}")
+                    st.info("Make sure LM Studio server is running!")
         
         # Show placeholder if no report yet
         if 'current_report' not in st.session_state:
@@ -179,29 +325,62 @@ Be concise and actionable."""
 with tab2:
     st.subheader("📊 Analysis History")
     
-    # Load history
-    history = storage.load_history()
+    # Metrics chart (long series are downsampled before plotting)
+    with st.expander("📈 Metrics over time"):
+        days = st.radio("Window", [1, 7, 30, 365], index=1, horizontal=True, key="chart_days",
+                        format_func=lambda d: f"{d} day{'s' if d > 1 else ''}")
+        data = metric_series(days)
+        if len(data['timestamp']):
+            st.plotly_chart(create_timeseries_chart(
+                data['timestamp'],
+                {
+                    'CPU %': data['cpu_percent'],
+                    'Memory %': data['mem_percent'],
+                    'Disk %': data['disk_percent']
+                }
+            ), key="history_chart")
+            st.caption(f"{len(data['timestamp']):,} samples")
+        else:
+            st.caption("No samples in this window yet")
+    
+    # Filters
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        type_filter = st.selectbox("Type", ["All", "system", "anomaly", "reanalysis", "email"], key="history_type")
+    with col2:
+        dates = st.date_input("Dates", value=(), key="history_dates")
+    with col3:
+        page_size = st.selectbox("Per page", [10, 20, 50], key="history_page_size")
+    
+    analysis_type = None if type_filter == "All" else type_filter
+    start = datetime.combine(dates[0], datetime.min.time()) if len(dates) > 0 else None
+    end = datetime.combine(dates[-1], datetime.max.time()) if len(dates) > 0 else None
+    
+    # Only the visible page is read, and it is reused until the history file changes
+    signature = storage.backend.signature()
+    total = history_count(signature, analysis_type, start, end)
     
-    if history:
-        st.info(f"📝 Total checks performed: **{len(history)}**")
+    if total:
+        pages = (total + page_size - 1) // page_size
+        st.info(f"📝 Matching checks: **{total}** · {pages} page{'s' if pages != 1 else ''}")
+        page = st.number_input("Page", min_value=1, max_value=pages, value=1, key="history_page") - 1
+        entries = history_page(signature, page, page_size, analysis_type, start, end)
         
-        # Show most recent first
-        for i, entry in enumerate(reversed(history)):
+        # Newest first
+        for i, entry in enumerate(entries):
             timestamp = entry.get('timestamp', 'Unknown time')
-            analysis_type = entry.get('type', 'system').title()
+            entry_type = entry.get('type', 'system').title()
             
-            with st.expander(f"🔍 {analysis_type} Check - {timestamp}", expanded=(i==0)):
+            with st.expander(f"🔍 {entry_type} Check - {timestamp}", expanded=(i == 0 and page == 0)):
                 # Show report
                 st.markdown("**System Report:**")
                 st.code(entry.get('report', 'No report'), language=None)
                 
                 # Show analysis
                 st.markdown("**AI Analysis:**")
-                st.info(entry.get('analysis', 'No analysis'))
-                
-                # Add separator
-                if i < len(history) - 1:
-                    st.markdown("---")
+                st.info(entry.get('analysis') or 'No analysis')
+    elif analysis_type or start:
+        st.warning("📭 No checks match these filters")
     else:
         st.warning("📭 No history yet!")
         st.markdown("""
@@ -224,9 +403,56 @@ Disk: 450.0 GB / 512.0 GB (87.9%)""")
 **Recommendation**: Free up disk space by removing temporary files""")
 
 # ============================================================
-# TAB 3: ABOUT
+# TAB 3: EMAIL
 # ============================================================
 with tab3:
+    st.subheader("📧 Email")
+    
+    if not email_configured:
+        st.warning("⚠️ Configure email in the sidebar to fetch and search mail")
+    else:
+        if st.button("📥 Fetch New Mail", key="fetch_mail_btn"):
+            with st.spinner("Fetching mail..."):
+                mail = get_mail()
+                st.session_state['recent_emails'] = mail.fetch_recent(Config.MAX_EMAILS_TO_CHECK, limit=20)
+                for (address, folder), error in mail.last_errors.items():
+                    st.error(f"❌ {address} / {folder}: {error}")
+        
+        if 'recent_emails' in st.session_state:
+            with st.expander(f"📬 Newest emails ({len(st.session_state['recent_emails'])})"):
+                for email_data in st.session_state['recent_emails']:
+                    st.markdown(f"**{email_data['subject']}** — {email_data['from']}")
+                    st.caption(f"{email_data['date']} · {email_data.get('folder', '')}")
+    
+    st.markdown("---")
+    st.markdown("**🔎 Search fetched mail**")
+    
+    index = get_email_index()
+    col1, col2, col3 = st.columns([2, 1, 1])
+    with col1:
+        query = st.text_input("Keywords", placeholder="invoice, disk*, ...", key="email_query")
+    with col2:
+        sender = st.text_input("From", key="email_sender")
+    with col3:
+        days = st.selectbox("Received", [None, 1, 7, 30, 365], key="email_days",
+                            format_func=lambda d: "Any time" if d is None else f"Last {d} days")
+    
+    if query or sender or days:
+        start = datetime.now() - timedelta(days=days) if days else None
+        results = index.search(query, sender=sender or None, start=start, limit=50)
+        st.caption(f"{len(results)} results from {index.count()} indexed emails")
+        
+        for email_data in results:
+            st.markdown(f"**{email_data['subject']}** — {email_data['from']}")
+            st.caption(f"{email_data['date']} · {email_data['account']} / {email_data['folder']}")
+            st.text(email_data['body_preview'][:200])
+    else:
+        st.caption(f"📚 {index.count()} emails indexed")
+
+# ============================================================
+# TAB 4: ABOUT
+# ============================================================
+with tab4:
     st.subheader("ℹ️ About This Project")
     
     col1, col2 = st.columns(2)
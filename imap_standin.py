@@ -0,0 +1,300 @@
+# imap_standin.py - Tiny local IMAP server for benchmarks and offline testing
+#
+# Usage: python imap_standin.py   (serves a demo mailbox on localhost:1143)
+
+import os
+import re
+import select
+import socket
+import socketserver
+import threading
+import time
+from email.mime.application import MIMEApplication
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from email.utils import formatdate
+
+
+def make_message(index, attachment_bytes=0):
+    """Build a test message, optionally with a binary attachment"""
+    message = MIMEMultipart()
+    message["Subject"] = f"Test message {index}"
+    message["From"] = f"sender{index % 7}@example.com"
+    message["Date"] = formatdate(time.time() - 3600 + index)
+    message.attach(MIMEText(f"Hello, this is message number {index}. " * 20))
+
+    if attachment_bytes:
+        attachment = MIMEApplication(os.urandom(attachment_bytes), Name="report.bin")
+        attachment["Content-Disposition"] = 'attachment; filename="report.bin"'
+        message.attach(attachment)
+
+    return message.as_bytes().replace(b"\n", b"\r\n")
+
+
+class Mailbox:
+    """Messages of one folder, with UIDs and \\Seen flags"""
+
+    def __init__(self, messages=(), uidvalidity=1):
+        self.uidvalidity = uidvalidity
+        self.messages = []  # (uid, raw bytes, flags)
+        self.next_uid = 1
+        for raw in messages:
+            self.add(raw)
+
+    def add(self, raw):
+        """Add a message and return its UID"""
+        uid = self.next_uid
+        self.next_uid += 1
+        self.messages.append((uid, raw, set()))
+        return uid
+
+
+class StandinServer(socketserver.ThreadingTCPServer):
+    """IMAP4rev1 subset: LOGIN, SELECT, SEARCH, FETCH, UID, NOOP, IDLE"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, folders, port=0, latency=0.0, bandwidth=None):
+        """
+        Initialize server
+
+        Args:
+            folders: dict of folder name -> Mailbox
+            port: TCP port (0 picks a free one)
+            latency: Seconds added to every command (simulated round trip)
+            bandwidth: Bytes per second for responses (None = unlimited)
+        """
+        super().__init__(("127.0.0.1", port), StandinHandler)
+        self.folders = folders
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.bytes_sent = 0
+        self.commands = 0
+        self.new_mail = threading.Condition()
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def start(self):
+        """Serve in a background thread"""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def deliver(self, folder, raw):
+        """Add a message and wake up IDLE clients"""
+        with self.new_mail:
+            uid = self.folders[folder].add(raw)
+            self.new_mail.notify_all()
+        return uid
+
+
+class StandinHandler(socketserver.StreamRequestHandler):
+    """One client connection"""
+
+    # Unbuffered reads, so select() sees everything the client sent
+    rbufsize = 0
+
+    def send(self, data):
+        """Write a response, throttled to the simulated bandwidth"""
+        if isinstance(data, str):
+            data = data.encode()
+        self.server.bytes_sent += len(data)
+        if self.server.bandwidth:
+            time.sleep(len(data) / self.server.bandwidth)
+        self.wfile.write(data)
+
+    def handle(self):
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.mailbox = None
+        self.send("* OK IMAP stand-in ready\r\n")
+
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+
+            self.server.commands += 1
+            if self.server.latency:
+                time.sleep(self.server.latency)
+
+            tag, _, rest = line.decode().strip().partition(" ")
+            command, _, args = rest.partition(" ")
+            command = command.upper()
+
+            uid_mode = command == "UID"
+            if uid_mode:
+                command, _, args = args.partition(" ")
+                command = command.upper()
+
+            handler = getattr(self, f"do_{command.lower()}", None)
+            if handler is None:
+                self.send(f"{tag} BAD unknown command\r\n")
+                continue
+
+            if handler(tag, args, uid_mode) is False:
+                return
+
+    def do_capability(self, tag, args, uid_mode):
+        self.send(f"* CAPABILITY IMAP4rev1 IDLE\r\n{tag} OK CAPABILITY completed\r\n")
+
+    def do_login(self, tag, args, uid_mode):
+        self.send(f"{tag} OK LOGIN completed\r\n")
+
+    def do_noop(self, tag, args, uid_mode):
+        if self.mailbox:
+            self.send(f"* {len(self.mailbox.messages)} EXISTS\r\n")
+        self.send(f"{tag} OK NOOP completed\r\n")
+
+    def do_logout(self, tag, args, uid_mode):
+        self.send(f"* BYE logging out\r\n{tag} OK LOGOUT completed\r\n")
+        return False
+
+    def do_close(self, tag, args, uid_mode):
+        self.mailbox = None
+        self.send(f"{tag} OK CLOSE completed\r\n")
+
+    def do_select(self, tag, args, uid_mode, mode="READ-WRITE"):
+        name = args.strip().strip('"')
+        self.mailbox = self.server.folders.get(name)
+        if self.mailbox is None:
+            self.send(f"{tag} NO no such folder\r\n")
+            return
+        self.send(
+            f"* {len(self.mailbox.messages)} EXISTS\r\n"
+            f"* 0 RECENT\r\n"
+            f"* OK [UIDVALIDITY {self.mailbox.uidvalidity}] UIDs valid\r\n"
+            f"* OK [UIDNEXT {self.mailbox.next_uid}] Predicted next UID\r\n"
+            f"{tag} OK [{mode}] SELECT completed\r\n"
+        )
+
+    def do_examine(self, tag, args, uid_mode):
+        self.do_select(tag, args, uid_mode, mode="READ-ONLY")
+
+    def do_status(self, tag, args, uid_mode):
+        name = args.split(" ")[0].strip('"')
+        mailbox = self.server.folders.get(name)
+        if mailbox is None:
+            self.send(f"{tag} NO no such folder\r\n")
+            return
+        self.send(
+            f'* STATUS "{name}" (MESSAGES {len(mailbox.messages)} '
+            f'UIDNEXT {mailbox.next_uid} UIDVALIDITY {mailbox.uidvalidity})\r\n'
+            f"{tag} OK STATUS completed\r\n"
+        )
+
+    def do_search(self, tag, args, uid_mode):
+        messages = self.mailbox.messages
+        wanted = range(1, len(messages) + 1)
+
+        match = re.search(r"UID (\S+)", args, re.IGNORECASE)
+        if match:
+            uids = self.parse_set(match.group(1), messages[-1][0] if messages else 0)
+            wanted = [i for i in wanted if messages[i - 1][0] in uids]
+
+        numbers = [str(messages[i - 1][0] if uid_mode else i) for i in wanted]
+        self.send(f"* SEARCH {' '.join(numbers)}\r\n".replace(" \r\n", "\r\n"))
+        self.send(f"{tag} OK SEARCH completed\r\n")
+
+    def do_fetch(self, tag, args, uid_mode):
+        message_set, _, items = args.partition(" ")
+        messages = self.mailbox.messages
+
+        if uid_mode:
+            uids = self.parse_set(message_set, messages[-1][0] if messages else 0)
+            selected = [i for i in range(1, len(messages) + 1) if messages[i - 1][0] in uids]
+        else:
+            numbers = self.parse_set(message_set, len(messages))
+            selected = [i for i in sorted(numbers) if 1 <= i <= len(messages)]
+
+        for number in selected:
+            uid, raw, flags = messages[number - 1]
+            header_end = raw.find(b"\r\n\r\n") + 4
+            parts = []
+
+            if uid_mode or re.search(r"\bUID\b", items, re.IGNORECASE):
+                parts.append(f"UID {uid}".encode())
+
+            for match in re.finditer(r"(BODY(?:\.PEEK)?\[([^\]]*)\](?:<(\d+)\.(\d+)>)?|RFC822)", items, re.IGNORECASE):
+                item, section, offset, length = match.groups()
+                if item.upper() == "RFC822":
+                    name, data = "RFC822", raw
+                    flags.add("\\Seen")
+                else:
+                    data = self.section(raw, header_end, section.upper())
+                    name = f"BODY[{section}]"
+                    if offset is not None:
+                        data = data[int(offset):int(offset) + int(length)]
+                        name += f"<{offset}>"
+                    if ".PEEK" not in item.upper():
+                        flags.add("\\Seen")
+
+                parts.append(name.encode() + f" {{{len(data)}}}\r\n".encode() + data)
+
+            self.send(f"* {number} FETCH (".encode() + b" ".join(parts) + b")\r\n")
+
+        self.send(f"{tag} OK FETCH completed\r\n")
+
+    def section(self, raw, header_end, section):
+        """Bytes of a BODY[...] section"""
+        if section == "TEXT":
+            return raw[header_end:]
+        if section.startswith("HEADER.FIELDS"):
+            names = re.findall(r"[\w-]+", section.split("(", 1)[1])
+            keep = []
+            for line in re.split(rb"\r\n(?![ \t])", raw[:header_end - 4]):
+                if line.split(b":", 1)[0].decode().upper() in names:
+                    keep.append(line)
+            return b"\r\n".join(keep) + b"\r\n\r\n"
+        if section == "HEADER":
+            return raw[:header_end]
+        return raw
+
+    def do_idle(self, tag, args, uid_mode):
+        self.send("+ idling\r\n")
+        count = len(self.mailbox.messages)
+
+        # Wait for new mail or DONE from the client
+        while True:
+            with self.server.new_mail:
+                self.server.new_mail.wait(0.05)
+                if len(self.mailbox.messages) != count:
+                    count = len(self.mailbox.messages)
+                    self.send(f"* {count} EXISTS\r\n")
+
+            readable, _, _ = select.select([self.connection], [], [], 0)
+            if readable:
+                line = self.rfile.readline()
+                if not line:
+                    return False
+                if line.strip().upper() == b"DONE":
+                    break
+
+        self.send(f"{tag} OK IDLE terminated\r\n")
+
+    @staticmethod
+    def parse_set(text, largest):
+        """Parse an IMAP sequence set like 1:5,7,9:* into a set of numbers"""
+        numbers = set()
+        for piece in text.split(","):
+            if ":" in piece:
+                low, high = piece.split(":")
+                low = largest if low == "*" else int(low)
+                high = largest if high == "*" else int(high)
+                numbers.update(range(min(low, high), max(low, high) + 1))
+            else:
+                numbers.add(largest if piece == "*" else int(piece))
+        return numbers
+
+
+# Run a demo server
+if __name__ == "__main__":
+    inbox = Mailbox(make_message(i, attachment_bytes=200_000 if i % 3 == 0 else 0) for i in range(50))
+    server = StandinServer({"INBOX": inbox, "alerts": Mailbox()}, port=1143)
+
+    print("\n" + "="*50)
+    print("IMAP stand-in on localhost:1143 (any login works)")
+    print("="*50 + "\n")
+    print("Set EMAIL_SERVER=127.0.0.1, EMAIL_PORT=1143, EMAIL_USE_SSL=false")
+    server.serve_forever()
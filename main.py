@@ -1,10 +1,35 @@
 # main.py - AI PC Health Analyzer (FIXED)
 
-from openai import OpenAI
 import sys
 sys.path.append('src')
 
-from tools.system_monitor import get_system_report
+from tools.system_monitor import get_snapshot, get_top_processes, format_report, get_sampler
+from tools.llm_service import get_analysis_service
+from tools.storage import Storage
+from tools.trend_context import build_trend_context
+from tools.anomaly_detector import get_anomaly_watcher, format_anomalies
+
+# Watch mode: sample continuously, ask the AI only when a reading leaves its normal range
+if "--watch" in sys.argv:
+    import time
+    
+    watcher = get_anomaly_watcher(Storage())
+    get_sampler().add_listener(watcher.on_reading)
+    print("👀 Watching your PC (Ctrl+C to stop)...\n")
+    
+    logged = 0
+    try:
+        while True:
+            time.sleep(1)
+            if watcher.logged > logged:
+                logged = watcher.logged
+                print(format_anomalies(watcher.last['anomalies']))
+                if watcher.last['analysis']:
+                    print("\n🤖 " + watcher.last['analysis'])
+                print()
+    except KeyboardInterrupt:
+        print(f"\n✅ Stopped: {watcher.logged} anomalies logged, {watcher.analyses} analyzed by AI\n")
+    sys.exit(0)
 
 print("\n" + "="*60)
 print("AI PC Health Analyzer")
@@ -12,44 +37,15 @@ print("="*60 + "\n")
 
 # Step 1: Get system report
 print("📊 Checking your PC...")
-system_report = get_system_report()
+snapshot = get_snapshot()
+system_report = format_report(snapshot, get_top_processes())
 print(system_report)
 
-# Step 2: Connect to AI
+# Step 2: Ask AI to analyze (clear-cut "Good" reports are answered by rules, no LLM call)
 print("\n🤖 Asking AI to analyze...\n")
 
-client = OpenAI(
-    base_url="http://localhost:1234/v1",
-    api_key="not-needed"
-)
-
-# Step 3: Ask AI to analyze - Combine instruction into user message
-prompt = f"""You are a PC health expert. Analyze this system report and provide:
-
-1. Overall Status (one word: Good/Warning/Critical)
-2. Main Issues (if any)
-3. Top Recommendation (one action to take)
-
-Keep it brief and clear.
-
-REPORT:
-{system_report}
-
-FORMAT:
-Status: [Good/Warning/Critical]
-Issues: [list or "None"]
-Action: [one recommendation]"""
-
-response = client.chat.completions.create(
-    model="local-model",
-    messages=[
-        {"role": "user", "content": prompt}  # All in user message
-    ],
-    temperature=0.7,
-    max_tokens=200
-)
-
-analysis = response.choices[0].message.content
+context = build_trend_context(Storage())  # last 7 days, within a fixed token budget
+analysis = get_analysis_service().analyze_system(system_report, snapshot, context)
 
 print("="*60)
 print("AI ANALYSIS:")
@@ -1,5 +1,6 @@
 # src/config.py - Load configuration
 
+import json
 import os
 from dotenv import load_dotenv
 
@@ -13,18 +14,124 @@ class Config:
     EMAIL_ADDRESS = os.getenv("EMAIL_ADDRESS", "")
     EMAIL_PASSWORD = os.getenv("EMAIL_PASSWORD", "")
     EMAIL_SERVER = os.getenv("EMAIL_SERVER", "imap.gmail.com")
+    EMAIL_PORT = int(os.getenv("EMAIL_PORT", "0")) or None  # default: 993 / 143
+    EMAIL_USE_SSL = os.getenv("EMAIL_USE_SSL", "true").lower() == "true"
+    EMAIL_FOLDERS = [name.strip() for name in os.getenv("EMAIL_FOLDERS", "INBOX").split(",") if name.strip()]
+    # Extra accounts as JSON: [{"address": ..., "password": ..., "server": ..., "folders": [...]}]
+    EMAIL_ACCOUNTS = os.getenv("EMAIL_ACCOUNTS", "")
+    EMAIL_FETCH_WORKERS = int(os.getenv("EMAIL_FETCH_WORKERS", "8"))
+    EMAIL_CACHE_FILE = os.getenv("EMAIL_CACHE_FILE", "data/email_cache.json")
+    EMAIL_CACHE_SIZE = int(os.getenv("EMAIL_CACHE_SIZE", "2000"))  # parsed messages kept
+    EMAIL_INDEX_PATH = os.getenv("EMAIL_INDEX_PATH", "data/email_index.db")
+    
+    # IMAP connection settings
+    IMAP_TIMEOUT_SECONDS = float(os.getenv("IMAP_TIMEOUT_SECONDS", "30"))
+    IMAP_KEEPALIVE_SECONDS = float(os.getenv("IMAP_KEEPALIVE_SECONDS", "240"))  # NOOP after this idle time
+    IMAP_IDLE_SECONDS = float(os.getenv("IMAP_IDLE_SECONDS", "1500"))  # re-issue IDLE (servers drop at ~29 min)
+    IMAP_CONNECT_ATTEMPTS = int(os.getenv("IMAP_CONNECT_ATTEMPTS", "3"))
+    IMAP_MAX_BACKOFF_SECONDS = float(os.getenv("IMAP_MAX_BACKOFF_SECONDS", "60"))
     
     # LM Studio settings
     LLM_BASE_URL = os.getenv("LLM_BASE_URL", "http://localhost:1234/v1")
+    LLM_MODEL = os.getenv("LLM_MODEL", "local-model")
+    LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "2"))  # requests LM Studio runs at once
+    LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "120"))
+    LLM_CONNECT_TIMEOUT_SECONDS = float(os.getenv("LLM_CONNECT_TIMEOUT_SECONDS", "5"))
+    LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+    LLM_QUEUE_TIMEOUT_SECONDS = float(os.getenv("LLM_QUEUE_TIMEOUT_SECONDS", "300"))  # wait for a free slot
+    LLM_BATCH_CONCURRENCY = int(os.getenv("LLM_BATCH_CONCURRENCY", "2"))  # batch prompts in flight
+    LLM_BATCH_ITEMS_PER_PROMPT = int(os.getenv("LLM_BATCH_ITEMS_PER_PROMPT", "4"))
+    LLM_BATCH_MAX_PROMPT_CHARS = int(os.getenv("LLM_BATCH_MAX_PROMPT_CHARS", "6000"))  # ~1500 tokens
+    TREND_CONTEXT_TOKENS = int(os.getenv("TREND_CONTEXT_TOKENS", "300"))  # history summary in the prompt
+    LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "256"))  # responses kept
+    LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", "3600"))
+    LLM_CACHE_FILE = os.getenv("LLM_CACHE_FILE", "data/llm_cache.json")  # empty = memory only
     
     # App settings
     CHECK_INTERVAL_HOURS = int(os.getenv("CHECK_INTERVAL_HOURS", "6"))
     MAX_EMAILS_TO_CHECK = int(os.getenv("MAX_EMAILS_TO_CHECK", "10"))
     
+    # Fast-path thresholds (%): all below "good" skips the LLM, "critical" marks the report critical
+    CPU_GOOD_BELOW = float(os.getenv("CPU_GOOD_BELOW", "70"))
+    CPU_CRITICAL_AT = float(os.getenv("CPU_CRITICAL_AT", "95"))
+    MEM_GOOD_BELOW = float(os.getenv("MEM_GOOD_BELOW", "75"))
+    MEM_CRITICAL_AT = float(os.getenv("MEM_CRITICAL_AT", "95"))
+    DISK_GOOD_BELOW = float(os.getenv("DISK_GOOD_BELOW", "85"))
+    DISK_CRITICAL_AT = float(os.getenv("DISK_CRITICAL_AT", "95"))
+    
+    # Storage settings
+    STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "jsonl")  # jsonl or sqlite
+    SQLITE_PATH = os.getenv("SQLITE_PATH", "data/history.db")
+    RETENTION_DAYS = int(os.getenv("RETENTION_DAYS", "30"))  # raw entries, older ones become rollups
+    COMPACT_INTERVAL_MINUTES = int(os.getenv("COMPACT_INTERVAL_MINUTES", "60"))
+    
+    # Metrics archive (Parquet, one folder per day)
+    ARCHIVE_ENABLED = os.getenv("ARCHIVE_ENABLED", "true").lower() == "true"
+    ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "data/metrics")
+    ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "300"))
+    
+    # System monitor settings
+    SAMPLE_INTERVAL_SECONDS = float(os.getenv("SAMPLE_INTERVAL_SECONDS", "1.0"))
+    SAMPLE_BUFFER_SIZE = int(os.getenv("SAMPLE_BUFFER_SIZE", "300"))
+    LIVE_REFRESH_SECONDS = float(os.getenv("LIVE_REFRESH_SECONDS", "2"))  # dashboard live panel
+    LIVE_CHART_POINTS = int(os.getenv("LIVE_CHART_POINTS", "120"))
+    PROCESS_TOP_N = int(os.getenv("PROCESS_TOP_N", "5"))  # processes listed per ranking
+    PROCESS_INTERVAL_SECONDS = float(os.getenv("PROCESS_INTERVAL_SECONDS", "5"))
+    
+    # Anomaly detection (EWMA baseline per metric, updated on every sample)
+    ANOMALY_ENABLED = os.getenv("ANOMALY_ENABLED", "true").lower() == "true"
+    ANOMALY_ALPHA = float(os.getenv("ANOMALY_ALPHA", "0.01"))  # weight of the newest sample
+    ANOMALY_Z_THRESHOLD = float(os.getenv("ANOMALY_Z_THRESHOLD", "4"))
+    ANOMALY_MIN_DELTA = float(os.getenv("ANOMALY_MIN_DELTA", "10"))  # percentage points above the mean
+    ANOMALY_SUSTAIN_SAMPLES = int(os.getenv("ANOMALY_SUSTAIN_SAMPLES", "10"))
+    ANOMALY_WARMUP_SAMPLES = int(os.getenv("ANOMALY_WARMUP_SAMPLES", "60"))
+    ANOMALY_AUTO_ANALYZE = os.getenv("ANOMALY_AUTO_ANALYZE", "true").lower() == "true"
+    ANOMALY_COOLDOWN_SECONDS = int(os.getenv("ANOMALY_COOLDOWN_SECONDS", "600"))  # between AI analyses
+    
     @classmethod
     def is_email_configured(cls):
         """Check if email is configured"""
-        return bool(cls.EMAIL_ADDRESS and cls.EMAIL_PASSWORD)
+        return bool(cls.get_email_accounts())
+    
+    @classmethod
+    def get_email_accounts(cls):
+        """All configured mailboxes as dicts (address, password, server, port, use_ssl, folders)"""
+        accounts = []
+        
+        if cls.EMAIL_ADDRESS and cls.EMAIL_PASSWORD:
+            accounts.append({
+                'address': cls.EMAIL_ADDRESS,
+                'password': cls.EMAIL_PASSWORD,
+                'server': cls.EMAIL_SERVER,
+                'port': cls.EMAIL_PORT,
+                'use_ssl': cls.EMAIL_USE_SSL,
+                'folders': cls.EMAIL_FOLDERS
+            })
+        
+        if cls.EMAIL_ACCOUNTS:
+            try:
+                extra = json.loads(cls.EMAIL_ACCOUNTS)
+            except ValueError:
+                print("❌ EMAIL_ACCOUNTS is not valid JSON")
+                extra = []
+            if not isinstance(extra, list):
+                print("❌ EMAIL_ACCOUNTS must be a JSON list of accounts")
+                extra = []
+            
+            for number, account in enumerate(extra, 1):
+                if not isinstance(account, dict) or not account.get('address') or not account.get('password'):
+                    print(f"❌ EMAIL_ACCOUNTS entry {number} skipped: needs an address and a password")
+                    continue
+                accounts.append({
+                    'address': account['address'],
+                    'password': account['password'],
+                    'server': account.get('server', cls.EMAIL_SERVER),
+                    'port': account.get('port'),
+                    'use_ssl': account.get('use_ssl', True),
+                    'folders': account.get('folders', ["INBOX"])
+                })
+        
+        return accounts
 
 # Test
 if __name__ == "__main__":
@@ -34,8 +141,12 @@ if __name__ == "__main__":
     
     print(f"Email configured: {Config.is_email_configured()}")
     print(f"Email address: {Config.EMAIL_ADDRESS if Config.EMAIL_ADDRESS else 'Not set'}")
+    print(f"Mailboxes: {len(Config.get_email_accounts())}")
     print(f"LLM URL: {Config.LLM_BASE_URL}")
     print(f"Check interval: {Config.CHECK_INTERVAL_HOURS} hours")
     print(f"Max emails: {Config.MAX_EMAILS_TO_CHECK}")
+    print(f"Storage backend: {Config.STORAGE_BACKEND}")
+    print(f"Raw history kept: {Config.RETENTION_DAYS} days")
+    print(f"Sample interval: {Config.SAMPLE_INTERVAL_SECONDS} seconds")
     
     print("\n✅ Configuration loaded!\n")
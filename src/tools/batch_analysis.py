@@ -0,0 +1,258 @@
+# src/tools/batch_analysis.py - Analyze many reports or emails with K prompts in flight
+
+import asyncio
+import os
+import re
+import sys
+import time
+
+# Run directly (python src/tools/...): make config and tools importable
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from tools.llm_service import get_analysis_service, SYSTEM_PROMPT, SYSTEM_PARAMS
+
+# Several items per prompt; the model answers each under its own "### Item N" heading
+BATCH_PROMPTS = {
+    'system': """Analyze each of these PC health reports and provide recommendations.
+
+{items}
+
+For EVERY item, answer under its own heading "### Item N" (same N as above) with:
+1. **Status**: Good/Warning/Critical (one word)
+2. **Issues**: List any problems found (or "None")
+3. **Recommendation**: One specific action to take
+
+Be concise and actionable.""",
+    'email': """Triage each of these emails.
+
+{items}
+
+For EVERY item, answer under its own heading "### Item N" (same N as above) with:
+1. **Priority**: High/Normal/Low (one word)
+2. **Category**: Work/Personal/Alert/Newsletter/Spam/Other
+3. **Action**: One short next step (or "None")
+
+Be concise."""
+}
+
+# Prompt for a single email (also used when a packed answer can't be split)
+EMAIL_PROMPT = """Triage this email:
+
+{item}
+
+Please provide:
+1. **Priority**: High/Normal/Low (one word)
+2. **Category**: Work/Personal/Alert/Newsletter/Spam/Other
+3. **Action**: One short next step (or "None")
+
+Be concise."""
+
+ITEM_HEADING = re.compile(r"^#+\s*Item\s+(\d+)\s*:?\s*$", re.IGNORECASE | re.MULTILINE)
+
+
+class BatchAnalyzer:
+    """Async pipeline: packs items into prompts and keeps K of them queued on the shared AnalysisService"""
+
+    def __init__(self, concurrency=None, items_per_prompt=None, max_prompt_chars=None, service=None):
+        """
+        Initialize analyzer
+
+        Args:
+            concurrency: Prompts in flight at once (K, at most the service's limit)
+            items_per_prompt: Most items packed into one prompt (1 = no packing)
+            max_prompt_chars: Items are only packed while the prompt stays under this size
+            service: AnalysisService every prompt goes through (default: shared service)
+        """
+        self.service = service or get_analysis_service()
+        self.concurrency = min(concurrency or Config.LLM_BATCH_CONCURRENCY, self.service.max_concurrency)
+        self.items_per_prompt = items_per_prompt or Config.LLM_BATCH_ITEMS_PER_PROMPT
+        self.max_prompt_chars = max_prompt_chars or Config.LLM_BATCH_MAX_PROMPT_CHARS
+        self.last_stats = {}
+
+    def pack(self, items):
+        """Split items into groups that are safe to send as one prompt"""
+        groups = []
+        current = []
+        size = 0
+
+        for item in items:
+            length = len(item['text'])
+            if current and (len(current) >= self.items_per_prompt or size + length > self.max_prompt_chars):
+                groups.append(current)
+                current, size = [], 0
+            current.append(item)
+            size += length
+
+        if current:
+            groups.append(current)
+        return groups
+
+    def build_messages(self, kind, group):
+        """Chat messages for one group of items of the same kind"""
+        if len(group) == 1 and kind == 'system':
+            content = SYSTEM_PROMPT.format(report=group[0]['text'])
+        elif len(group) == 1:
+            content = EMAIL_PROMPT.format(item=group[0]['text'])
+        else:
+            blocks = "\n\n".join(f"### Item {i}\n{item['text']}" for i, item in enumerate(group, 1))
+            content = BATCH_PROMPTS[kind].format(items=blocks)
+        return [{"role": "user", "content": content}]
+
+    def max_tokens(self, group):
+        """Answer budget grows with the number of packed items"""
+        return SYSTEM_PARAMS['max_tokens'] * len(group)
+
+    def run(self, items):
+        """
+        Analyze items and return them with an 'analysis' field, in input order
+
+        Args:
+            items: dicts with 'kind' ("system" or "email") and 'text', plus anything to keep
+        """
+        return asyncio.run(self.run_async(items))
+
+    async def run_async(self, items):
+        """run() for callers that already have an event loop"""
+        start = time.perf_counter()
+        self.last_stats = {'items': len(items), 'prompts': 0, 'unpacked': 0, 'failed': 0}
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        # Never pack different kinds of items together
+        groups = []
+        for kind in dict.fromkeys(item['kind'] for item in items):
+            groups.extend((kind, group) for group in self.pack([i for i in items if i['kind'] == kind]))
+
+        await asyncio.gather(*(self._analyze_group(semaphore, kind, group) for kind, group in groups))
+
+        seconds = time.perf_counter() - start
+        self.last_stats['seconds'] = seconds
+        self.last_stats['items_per_minute'] = len(items) / seconds * 60 if seconds > 0 else 0.0
+        return items
+
+    async def _analyze_group(self, semaphore, kind, group):
+        """Send one packed prompt; items whose answer can't be found are retried one by one"""
+        try:
+            text = await self._complete(semaphore, self.build_messages(kind, group), self.max_tokens(group))
+        except Exception as e:
+            for item in group:
+                item['error'] = str(e)
+            self.last_stats['failed'] += len(group)
+            return
+
+        if len(group) == 1:
+            group[0]['analysis'] = text.strip()
+            return
+
+        answers = split_answers(text, len(group))
+        missing = []
+        for item, answer in zip(group, answers):
+            if answer:
+                item['analysis'] = answer
+            else:
+                missing.append(item)
+
+        if missing:
+            self.last_stats['unpacked'] += len(missing)
+            await asyncio.gather(*(self._analyze_group(semaphore, kind, [item]) for item in missing))
+
+    async def _complete(self, semaphore, messages, max_tokens):
+        """One chat completion through the service (its LLM cache, fair queue and retries)"""
+        async with semaphore:
+            self.last_stats['prompts'] += 1
+            text = await asyncio.to_thread(self.service.complete, messages,
+                                           temperature=SYSTEM_PARAMS['temperature'], max_tokens=max_tokens)
+        return text or ""
+
+
+def split_answers(text, count):
+    """Cut a packed answer at its "### Item N" headings (None for items it skipped)"""
+    answers = [None] * count
+    headings = list(ITEM_HEADING.finditer(text))
+
+    for i, match in enumerate(headings):
+        number = int(match.group(1))
+        end = headings[i + 1].start() if i + 1 < len(headings) else len(text)
+        answer = text[match.end():end].strip()
+        if 1 <= number <= count and answer:
+            answers[number - 1] = answer
+
+    return answers
+
+
+def history_items(entries):
+    """Batch items from history entries (re-analysis; remembers which check each came from)"""
+    return [
+        {'kind': 'system', 'text': entry.get('report', ''), 'checked_at': entry.get('timestamp')}
+        for entry in entries if entry.get('report')
+    ]
+
+
+def email_items(emails):
+    """Batch items from email dicts (triage)"""
+    return [
+        {
+            'kind': 'email',
+            'text': (f"From: {email_data.get('from', '')}\n"
+                     f"Subject: {email_data.get('subject', '')}\n"
+                     f"Preview: {email_data.get('body_preview', '')[:300]}")
+        }
+        for email_data in emails
+    ]
+
+
+def save_results(storage, items, analysis_type):
+    """
+    Write analyzed items back through Storage in one bulk write
+
+    Old readings are not copied: the new entries are stamped with the current time,
+    so their metrics would show up as fresh samples in the trends and the archive.
+    """
+    return storage.save_many([
+        {
+            'type': analysis_type,
+            'report': (f"Re-analysis of the check from {item['checked_at']}\n\n{item['text']}"
+                       if item.get('checked_at') else item['text']),
+            'analysis': item['analysis']
+        }
+        for item in items if item.get('analysis')
+    ])
+
+# Run a batch: python src/tools/batch_analysis.py [history|emails] [N]
+if __name__ == "__main__":
+    import sys
+
+    from tools.storage import Storage
+
+    source = sys.argv[1] if len(sys.argv) > 1 else "history"
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    print("\n" + "="*50)
+    print(f"Batch Analysis: {source}")
+    print("="*50 + "\n")
+
+    storage = Storage()
+    if source == "emails":
+        from tools.email_coordinator import EmailFetchCoordinator
+        items = email_items(EmailFetchCoordinator().fetch_recent(count, limit=count))
+        analysis_type = "email"
+    else:
+        items = history_items(storage.get_page(0, count, analysis_type="system"))
+        analysis_type = "reanalysis"
+
+    if not items:
+        print("📭 Nothing to analyze")
+    else:
+        analyzer = BatchAnalyzer()
+        analyzer.run(items)
+        saved = save_results(storage, items, analysis_type)
+        stats = analyzer.last_stats
+
+        print(f"Items: {stats['items']} in {stats['prompts']} prompts "
+              f"({analyzer.items_per_prompt} per prompt, {analyzer.concurrency} in flight)")
+        if stats['unpacked'] or stats['failed']:
+            print(f"⚠️  {stats['unpacked']} re-asked one by one, {stats['failed']} failed")
+        print(f"Saved: {saved} entries")
+        print(f"\n✅ {stats['items_per_minute']:.1f} items/minute ({stats['seconds']:.1f}s total)\n")
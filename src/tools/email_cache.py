@@ -0,0 +1,132 @@
+# src/tools/email_cache.py - Local cache of parsed emails and per-folder sync state
+
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from config import Config
+
+class EmailCache:
+    """Parsed-message LRU cache plus UIDVALIDITY / UID high-water marks, saved to disk"""
+
+    def __init__(self, filename=None, max_size=None):
+        """
+        Initialize cache
+
+        Args:
+            filename: JSON file the cache is saved to (default: Config.EMAIL_CACHE_FILE)
+            max_size: Most messages kept (least recently used are evicted)
+        """
+        self.filename = filename or Config.EMAIL_CACHE_FILE
+        self.max_size = max_size or Config.EMAIL_CACHE_SIZE
+        self.folders = {}
+        self.messages = OrderedDict()
+        self._dirty = False
+        self._lock = threading.RLock()
+        self._save_lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """Read the cache file (starts empty if missing or unreadable)"""
+        try:
+            with open(self.filename, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        with self._lock:
+            self.folders = data.get('folders', {})
+            self.messages = OrderedDict(data.get('messages', []))
+
+    def save(self):
+        """Write the cache file atomically (skipped if nothing changed; errors are only reported)"""
+        # One writer at a time, so an older copy never replaces a newer one
+        with self._save_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                self._dirty = False
+                data = {
+                    'folders': self.folders,
+                    'messages': list(self.messages.items())
+                }
+
+            # Temp name per process, in case the dashboard and main.py save at once
+            temp_name = f"{self.filename}.{os.getpid()}.tmp"
+            try:
+                os.makedirs(os.path.dirname(self.filename) or ".", exist_ok=True)
+                with open(temp_name, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False)
+                os.replace(temp_name, self.filename)
+            except OSError as e:
+                print(f"❌ Could not save email cache: {e}")
+                with self._lock:
+                    self._dirty = True
+
+    def folder_state(self, account, folder):
+        """Sync state {uidvalidity, last_uid, uids} of a folder, or None"""
+        with self._lock:
+            return self.folders.get(f"{account}|{folder}")
+
+    def set_folder_state(self, account, folder, uidvalidity, uids):
+        """Remember the newest UIDs seen in a folder"""
+        uids = sorted(uids)[-self.max_size:]
+        with self._lock:
+            self.folders[f"{account}|{folder}"] = {
+                'uidvalidity': uidvalidity,
+                'last_uid': uids[-1] if uids else 0,
+                'uids': uids
+            }
+            self._dirty = True
+
+    def reset_folder(self, account, folder):
+        """Forget a folder (its UIDVALIDITY changed)"""
+        prefix = f"{account}|{folder}|"
+        with self._lock:
+            self.folders.pop(f"{account}|{folder}", None)
+            for key in [key for key in self.messages if key.startswith(prefix)]:
+                del self.messages[key]
+            self._dirty = True
+
+    def remove(self, account, folder, uidvalidity, uids):
+        """Drop cached emails (expunged on the server)"""
+        with self._lock:
+            for uid in uids:
+                if self.messages.pop(f"{account}|{folder}|{uidvalidity}|{uid}", None) is not None:
+                    self._dirty = True
+
+    def get(self, account, folder, uidvalidity, uid):
+        """Get a cached email dict (marks it recently used)"""
+        key = f"{account}|{folder}|{uidvalidity}|{uid}"
+        with self._lock:
+            email_data = self.messages.get(key)
+            if email_data is not None:
+                self.messages.move_to_end(key)
+            return email_data
+
+    def put(self, account, folder, uidvalidity, uid, email_data):
+        """Cache an email dict, evicting the least recently used ones"""
+        key = f"{account}|{folder}|{uidvalidity}|{uid}"
+        with self._lock:
+            self.messages[key] = email_data
+            self.messages.move_to_end(key)
+            while len(self.messages) > self.max_size:
+                self.messages.popitem(last=False)
+            self._dirty = True
+
+
+# One cache per process
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_email_cache():
+    """Get the process-wide email cache"""
+    global _cache
+
+    with _cache_lock:
+        if _cache is None:
+            _cache = EmailCache()
+
+    return _cache
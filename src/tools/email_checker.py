@@ -1,14 +1,34 @@
 # src/tools/email_checker.py
 
-import imaplib
 import email
+import os
+import re
+import sys
 from email.header import decode_header
+from email.utils import parsedate_to_datetime
 from datetime import datetime
 
+# Run directly (python src/tools/...): make config and tools importable
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.email_cache import get_email_cache
+from tools.email_index import get_email_index
+from tools.imap_session import get_session
+
+# Bytes of message text fetched for the preview (enough for MIME part headers)
+PREVIEW_BYTES = 2048
+
+# One FETCH for all messages: a few headers plus the start of the text.
+# BODY.PEEK leaves the \Seen flag alone, and attachments are never downloaded.
+HEADER_FIELDS = "SUBJECT FROM DATE CONTENT-TYPE CONTENT-TRANSFER-ENCODING"
+FETCH_ITEMS = f"(BODY.PEEK[HEADER.FIELDS ({HEADER_FIELDS})] BODY.PEEK[TEXT]<0.{PREVIEW_BYTES}>)"
+
 class EmailChecker:
     """Simple email checker for Gmail/Outlook"""
     
-    def __init__(self, email_address, password, imap_server="imap.gmail.com"):
+    def __init__(self, email_address, password, imap_server="imap.gmail.com", port=None, use_ssl=True,
+                 cache=None, channel=None, index=None):
         """
         Initialize email checker
         
@@ -16,69 +36,213 @@ class EmailChecker:
             email_address: Your email address
             password: App password (NOT your regular password)
             imap_server: IMAP server (default: Gmail)
+            port: IMAP port (default: 993 with SSL, 143 without)
+            use_ssl: Use IMAP over SSL
+            cache: EmailCache for parsed messages (default: shared cache, False: none)
+            channel: Use a separate connection with this name (see get_session)
+            index: EmailIndex new messages are added to (default: shared index, False: none)
         """
         self.email_address = email_address
         self.password = password
         self.imap_server = imap_server
-        self.mail = None
+        self.port = port
+        self.use_ssl = use_ssl
+        self.cache = get_email_cache() if cache is None else cache
+        self.index = get_email_index() if index is None else index
+        
+        # Shared, kept-alive connection for this account
+        self.session = get_session(email_address, password, imap_server, port, use_ssl, channel)
+    
+    @property
+    def mail(self):
+        """Current IMAP connection (None until connected)"""
+        return self.session.mail
     
     def connect(self):
         """Connect to email server"""
         try:
-            self.mail = imaplib.IMAP4_SSL(self.imap_server)
-            self.mail.login(self.email_address, self.password)
+            self.session.get()
             return True
         except Exception as e:
             print(f"❌ Connection failed: {e}")
             return False
     
     def get_recent_emails(self, num_emails=5, folder="INBOX"):
-        """Get recent emails"""
-        if not self.mail:
-            if not self.connect():
-                return []
+        """Get recent emails (only new UIDs are fetched, the rest come from the cache)"""
+        try:
+            return self.session.run(lambda mail: self._get_recent_emails(mail, num_emails, folder))
+        except Exception as e:
+            print(f"❌ Error fetching emails: {e}")
+            return []
+    
+    def _get_recent_emails(self, mail, num_emails, folder):
+        """get_recent_emails on a live connection"""
+        # Select folder
+        mail.select(folder)
+        uidvalidity = self.get_uidvalidity()
+        
+        # UIDs of the folder, newest last
+        uids = self.sync_uids(folder, uidvalidity)
         
+        # Get last N emails
+        return self.fetch_by_uid(folder, uidvalidity, uids[-num_emails:])
+    
+    def watch(self, on_new_mail, folder="INBOX"):
+        """Get pushed new-mail notifications via IMAP IDLE (returns the IdleWatcher)"""
+        return self.session.watch(folder, on_new_mail)
+    
+    @property
+    def account(self):
+        """Key for this mailbox in the cache"""
+        return f"{self.email_address}@{self.imap_server}"
+    
+    def get_uidvalidity(self):
+        """UIDVALIDITY of the selected folder"""
+        _, data = self.mail.response("UIDVALIDITY")
         try:
-            # Select inbox
-            self.mail.select(folder)
-            
-            # Search for all emails
-            _, message_numbers = self.mail.search(None, "ALL")
+            return int(data[0])
+        except (TypeError, ValueError, IndexError):
+            return 0
+    
+    def sync_uids(self, folder, uidvalidity):
+        """Update the folder's known UIDs: add new ones and drop those expunged on the server"""
+        state = self.cache.folder_state(self.account, folder) if self.cache else None
+        vanished = []
+        
+        if state and state['uidvalidity'] == uidvalidity:
+            # Incremental: one UID SEARCH from the oldest known UID returns both the new
+            # messages and which known ones still exist (UIDs only, no message data)
+            last_uid = state['last_uid']
+            first_uid = state['uids'][0] if state['uids'] else last_uid + 1
+            _, data = self.mail.uid("SEARCH", None, f"UID {first_uid}:*")
+            # "n:*" matches the newest message even below n, hence the filter
+            existing = {int(uid) for uid in data[0].split() if int(uid) >= first_uid}
+            new_uids = sorted(uid for uid in existing if uid > last_uid)
+            vanished = [uid for uid in state['uids'] if uid not in existing]
+            uids = [uid for uid in state['uids'] if uid in existing] + new_uids
             
-            # Get last N emails
-            email_ids = message_numbers[0].split()
-            email_ids = email_ids[-num_emails:]  # Get last N
+            if vanished:
+                self.cache.remove(self.account, folder, uidvalidity, vanished)
+                if self.index:
+                    self.index.remove(self.email_address, folder, vanished)
+        else:
+            # First sync, or UIDVALIDITY changed: full resync
+            if state:
+                self.cache.reset_folder(self.account, folder)
+                if self.index:
+                    self.index.remove_folder(self.email_address, folder)
+            _, data = self.mail.uid("SEARCH", None, "ALL")
+            new_uids = uids = [int(uid) for uid in data[0].split()]
+        
+        if self.cache and (new_uids or vanished or not state):
+            self.cache.set_folder_state(self.account, folder, uidvalidity, uids)
+        
+        return sorted(uids)
+    
+    def fetch_by_uid(self, folder, uidvalidity, uids):
+        """Get emails by UID (cached ones are not fetched again), newest first"""
+        emails = {}
+        missing = []
+        
+        for uid in uids:
+            cached = self.cache.get(self.account, folder, uidvalidity, uid) if self.cache else None
+            if cached is not None:
+                emails[uid] = cached
+            else:
+                missing.append(uid)
+        
+        if missing:
+            # Fetch headers and a short preview of all missing ones at once
+            message_set = ",".join(str(uid) for uid in missing)
+            _, msg_data = self.mail.uid("FETCH", message_set, FETCH_ITEMS)
             
-            emails = []
+            fetched = []
+            for email_data in self.parse_fetch_response(msg_data):
+                uid = email_data.get('uid')
+                if uid is None:
+                    continue
+                email_data['folder'] = folder
+                emails[uid] = email_data
+                fetched.append(email_data)
+                if self.cache:
+                    self.cache.put(self.account, folder, uidvalidity, uid, email_data)
             
-            for email_id in reversed(email_ids):  # Newest first
-                # Fetch email
-                _, msg_data = self.mail.fetch(email_id, "(RFC822)")
-                
-                # Parse email
-                email_body = msg_data[0][1]
-                message = email.message_from_bytes(email_body)
-                
-                # Extract info
-                subject = self.decode_subject(message["Subject"])
-                from_addr = message.get("From", "Unknown")
-                date = message.get("Date", "Unknown")
-                
-                # Get email body (simplified)
-                body = self.get_email_body(message)
-                
-                emails.append({
-                    "subject": subject,
-                    "from": from_addr,
-                    "date": date,
-                    "body_preview": body[:200] if body else "No content"
-                })
+            if self.index:
+                self.index.add(fetched)
+        
+        if self.cache:
+            self.cache.save()
+        
+        return [emails[uid] for uid in reversed(uids) if uid in emails]
+    
+    def parse_fetch_response(self, msg_data):
+        """Turn a header + partial-text FETCH response into email dicts, newest first"""
+        messages = {}
+        current = None
+        
+        for item in msg_data:
+            if not isinstance(item, tuple):
+                # Some servers send the UID after the literals, e.g. b' UID 40)'
+                match = re.search(rb"UID (\d+)", item or b"")
+                if match and current is not None:
+                    current['uid'] = int(match.group(1))
+                continue
             
-            return emails
+            prefix, data = item
+            # Prefix looks like b'12 (UID 40 BODY[HEADER.FIELDS (...)] {310}'
+            # or b' BODY[TEXT]<0> {2048}' for the next part of the same message
+            if prefix[:1].isdigit():
+                number = int(prefix.split(b" ", 1)[0])
+                current = messages.setdefault(number, {'header': b"", 'text': b""})
+                match = re.search(rb"UID (\d+)", prefix)
+                if match:
+                    current['uid'] = int(match.group(1))
             
-        except Exception as e:
-            print(f"❌ Error fetching emails: {e}")
-            return []
+            if current is None:
+                continue
+            if b"HEADER" in prefix.upper():
+                current['header'] = data
+            elif b"TEXT" in prefix.upper():
+                current['text'] = data
+        
+        emails = []
+        for number in sorted(messages, reverse=True):  # Newest first
+            parts = messages[number]
+            email_data = self.parse_partial_message(parts['header'], parts['text'])
+            if 'uid' in parts:
+                email_data['uid'] = parts['uid']
+            emails.append(email_data)
+        
+        return emails
+    
+    def parse_partial_message(self, header, text):
+        """Build an email dict from header fields and the start of the body"""
+        # Header block ends with a blank line, so the two parts make a (truncated) message
+        message = email.message_from_bytes(header + text)
+        
+        # Extract info
+        subject = self.decode_subject(message["Subject"])
+        from_addr = message.get("From", "Unknown")
+        date = message.get("Date", "Unknown")
+        
+        # Get email body (simplified)
+        body = self.get_email_body(message)
+        
+        return {
+            "subject": subject,
+            "from": from_addr,
+            "date": date,
+            "timestamp": self.parse_date(date),
+            "account": self.email_address,
+            "body_preview": body[:200] if body else "No content"
+        }
+    
+    def parse_date(self, date):
+        """Date header as Unix time (0 if missing or malformed)"""
+        try:
+            return parsedate_to_datetime(date).timestamp()
+        except (TypeError, ValueError, IndexError):
+            return 0.0
     
     def decode_subject(self, subject):
         """Decode email subject"""
@@ -104,17 +268,26 @@ class EmailChecker:
         if message.is_multipart():
             for part in message.walk():
                 if part.get_content_type() == "text/plain":
-                    try:
-                        return part.get_payload(decode=True).decode()
-                    except:
-                        return ""
+                    return self.decode_payload(part)
         else:
-            try:
-                return message.get_payload(decode=True).decode()
-            except:
-                return ""
+            return self.decode_payload(message)
         return ""
     
+    def decode_payload(self, part):
+        """Decode a text part (tolerates previews cut off mid-character)"""
+        try:
+            payload = part.get_payload(decode=True)
+            charset = part.get_content_charset() or "utf-8"
+            return payload.decode(charset, errors="ignore")
+        except:
+            return ""
+    
+    def search(self, query=None, sender=None, start=None, end=None, folder=None, limit=20):
+        """Search this account's fetched emails in the local index (see EmailIndex.search)"""
+        index = self.index or get_email_index()
+        return index.search(query, sender=sender, start=start, end=end,
+                            account=self.email_address, folder=folder, limit=limit)
+    
     def format_email_summary(self, emails):
         """Format emails as readable text"""
         if not emails:
@@ -132,12 +305,7 @@ class EmailChecker:
     
     def disconnect(self):
         """Close connection"""
-        if self.mail:
-            try:
-                self.mail.close()
-                self.mail.logout()
-            except:
-                pass
+        self.session.close()
 
 # Test (with dummy credentials - won't actually work)
 if __name__ == "__main__":
@@ -0,0 +1,125 @@
+# src/tools/email_coordinator.py - Fetch several accounts and folders at once
+
+import heapq
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Run directly (python src/tools/...): make config and tools importable
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from tools.email_checker import EmailChecker
+
+
+class EmailFetchCoordinator:
+    """Fetches every (account, folder) on its own connection in parallel and merges the results"""
+
+    def __init__(self, accounts=None, max_workers=None, cache=None, index=None):
+        """
+        Initialize coordinator
+
+        Args:
+            accounts: List of account dicts (default: Config.get_email_accounts())
+            max_workers: Most folders fetched at the same time
+            cache: EmailCache passed to every checker (default: shared cache)
+            index: EmailIndex passed to every checker (default: shared index)
+        """
+        self.accounts = Config.get_email_accounts() if accounts is None else accounts
+        self.max_workers = max_workers or Config.EMAIL_FETCH_WORKERS
+        self.last_timings = {}
+        self.last_errors = {}
+
+        # One checker (and connection) per folder, so a slow folder doesn't hold up the rest
+        self.checkers = {}
+        for account in self.accounts:
+            for folder in account.get('folders') or ["INBOX"]:
+                self.checkers[(account['address'], folder)] = EmailChecker(
+                    account['address'],
+                    account['password'],
+                    account.get('server') or Config.EMAIL_SERVER,
+                    port=account.get('port'),
+                    use_ssl=account.get('use_ssl', True),
+                    cache=cache,
+                    channel=folder,
+                    index=index
+                )
+
+    def fetch_recent(self, num_emails=5, limit=None):
+        """
+        Get the newest emails of every folder, merged newest first
+
+        Args:
+            num_emails: Emails fetched per folder
+            limit: Most emails returned in total (default: all)
+        """
+        if not self.checkers:
+            return []
+
+        workers = min(self.max_workers, len(self.checkers))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="email-fetch") as pool:
+            futures = {
+                key: pool.submit(self._fetch_one, checker, key[1], num_emails)
+                for key, checker in self.checkers.items()
+            }
+            results = {key: future.result() for key, future in futures.items()}
+
+        self.last_timings = {key: seconds for key, (seconds, _, _) in results.items()}
+        self.last_errors = {key: error for key, (_, _, error) in results.items() if error}
+
+        # Each folder comes back newest first - merge without a full sort
+        merged = heapq.merge(
+            *(emails for _, emails, _ in results.values()),
+            key=lambda email_data: email_data.get('timestamp', 0),
+            reverse=True
+        )
+        merged = list(merged)
+        return merged[:limit] if limit else merged
+
+    def _fetch_one(self, checker, folder, num_emails):
+        """Fetch one folder, returning (seconds, emails, error)"""
+        start = time.perf_counter()
+        try:
+            emails = checker.session.run(lambda mail: checker._get_recent_emails(mail, num_emails, folder))
+            error = None
+        except Exception as e:
+            emails, error = [], str(e)
+
+        # Cached entries from before dates were parsed have no timestamp yet
+        for email_data in emails:
+            if 'timestamp' not in email_data:
+                email_data['timestamp'] = checker.parse_date(email_data.get('date'))
+            email_data.setdefault('account', checker.email_address)
+        emails.sort(key=lambda email_data: email_data['timestamp'], reverse=True)
+
+        return time.perf_counter() - start, emails, error
+
+    def disconnect(self):
+        """Close every folder connection"""
+        for checker in self.checkers.values():
+            checker.disconnect()
+
+
+# Test
+if __name__ == "__main__":
+    print("\n" + "="*50)
+    print("Email Fetch Coordinator Test")
+    print("="*50 + "\n")
+
+    coordinator = EmailFetchCoordinator()
+    print(f"Mailboxes: {len(coordinator.checkers)} (account, folder) pairs")
+
+    if coordinator.checkers:
+        emails = coordinator.fetch_recent(5, limit=10)
+        for (address, folder), seconds in coordinator.last_timings.items():
+            print(f"   {address} / {folder}: {seconds * 1000:.0f} ms")
+        for (address, folder), error in coordinator.last_errors.items():
+            print(f"❌ {address} / {folder}: {error}")
+        print(f"\nNewest {len(emails)} emails across all folders")
+        coordinator.disconnect()
+    else:
+        print("⚠️  Set EMAIL_ADDRESS / EMAIL_PASSWORD or EMAIL_ACCOUNTS in .env")
+
+    print("\n✅ Coordinator working!\n")
@@ -0,0 +1,257 @@
+# src/tools/email_index.py - Full-text search index over fetched emails (SQLite FTS5)
+
+import os
+import re
+import sqlite3
+import sys
+import threading
+from datetime import datetime
+
+# Run directly (python src/tools/...): make config and tools importable
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS emails (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    account TEXT NOT NULL,
+    folder TEXT NOT NULL,
+    uid INTEGER,
+    timestamp REAL NOT NULL,
+    subject TEXT,
+    sender TEXT,
+    date TEXT,
+    body_preview TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_emails_timestamp ON emails (timestamp);
+CREATE INDEX IF NOT EXISTS idx_emails_account_folder ON emails (account, folder);
+CREATE VIRTUAL TABLE IF NOT EXISTS emails_fts USING fts5 (
+    subject, sender, body_preview,
+    content='emails', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS emails_ai AFTER INSERT ON emails BEGIN
+    INSERT INTO emails_fts (rowid, subject, sender, body_preview)
+    VALUES (new.id, new.subject, new.sender, new.body_preview);
+END;
+CREATE TRIGGER IF NOT EXISTS emails_ad AFTER DELETE ON emails BEGIN
+    INSERT INTO emails_fts (emails_fts, rowid, subject, sender, body_preview)
+    VALUES ('delete', old.id, old.subject, old.sender, old.body_preview);
+END;
+"""
+
+# bm25 column weights: a hit in the subject counts more than one in the body
+RANK = "bm25(emails_fts, 10.0, 5.0, 1.0)"
+
+# Very common words match most of the index; only the newest matches are ranked
+RANK_WINDOW = 5000
+
+COLUMNS = ('account', 'folder', 'uid', 'timestamp', 'subject', 'sender', 'date', 'body_preview')
+
+class EmailIndex:
+    """Inverted index over subject, sender and body preview, updated as mail is fetched"""
+
+    def __init__(self, filename=None):
+        """
+        Initialize index
+
+        Args:
+            filename: Database file (default: Config.EMAIL_INDEX_PATH)
+        """
+        self.filename = filename or Config.EMAIL_INDEX_PATH
+        self._local = threading.local()
+
+        os.makedirs(os.path.dirname(self.filename) or ".", exist_ok=True)
+        with self.connection() as conn:
+            conn.executescript(SCHEMA)
+
+    def connection(self):
+        """Get this thread's connection (opened on first use)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.filename, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def add(self, emails):
+        """Index email dicts (already indexed ones are skipped), returns how many were new"""
+        rows = [
+            (
+                f"{email_data.get('account', '')}|{email_data.get('folder', '')}|{email_data.get('uid')}",
+                email_data.get('account', ''),
+                email_data.get('folder', ''),
+                email_data.get('uid'),
+                email_data.get('timestamp') or 0.0,
+                email_data.get('subject', ''),
+                email_data.get('from', ''),
+                email_data.get('date', ''),
+                email_data.get('body_preview', '')
+            )
+            for email_data in emails
+        ]
+        if not rows:
+            return 0
+
+        with self.connection() as conn:
+            cursor = conn.executemany(
+                "INSERT OR IGNORE INTO emails (key, account, folder, uid, timestamp, subject, sender, date, body_preview) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            return cursor.rowcount
+
+    def search(self, query=None, sender=None, start=None, end=None, account=None, folder=None, limit=20):
+        """
+        Find emails, best match first (newest first without a query)
+
+        With a query and no end date, only the newest RANK_WINDOW matches are ranked.
+
+        Args:
+            query: Keywords matched against subject, sender and body ("word*" for prefixes)
+            sender: Only emails whose From contains this text
+            start: datetime or Unix time (default: beginning)
+            end: datetime or Unix time (default: now)
+            account: Only this account
+            folder: Only this folder
+            limit: Most results returned
+
+        Returns:
+            List of email dicts (with a 'score' when a query was given)
+        """
+        where = []
+        params = []
+
+        match = _match_expression(query)
+        if match:
+            where.append("emails_fts MATCH ?")
+            params.append(match)
+            if end is None:
+                # Skip scoring older matches - a cheap rowid lookup bounds the window
+                where.append(
+                    "emails_fts.rowid >= coalesce((SELECT rowid FROM emails_fts WHERE emails_fts MATCH ? "
+                    "ORDER BY rowid DESC LIMIT 1 OFFSET ?), 0)"
+                )
+                params.extend([match, RANK_WINDOW - 1])
+        if sender:
+            where.append("e.sender LIKE ?")
+            params.append(f"%{sender}%")
+        if start is not None:
+            where.append("e.timestamp >= ?")
+            params.append(_to_epoch(start))
+        if end is not None:
+            where.append("e.timestamp <= ?")
+            params.append(_to_epoch(end))
+        if account:
+            where.append("e.account = ?")
+            params.append(account)
+        if folder:
+            where.append("e.folder = ?")
+            params.append(folder)
+
+        columns = ", ".join(f"e.{name}" for name in COLUMNS)
+        if match:
+            sql = (f"SELECT {columns}, {RANK} AS score FROM emails_fts "
+                   f"JOIN emails e ON e.id = emails_fts.rowid "
+                   f"WHERE {' AND '.join(where)} ORDER BY score, e.timestamp DESC LIMIT ?")
+        else:
+            condition = f"WHERE {' AND '.join(where)}" if where else ""
+            sql = f"SELECT {columns}, NULL AS score FROM emails e {condition} ORDER BY e.timestamp DESC LIMIT ?"
+        params.append(limit)
+
+        results = []
+        for row in self.connection().execute(sql, params):
+            email_data = dict(zip(COLUMNS, row[:-1]))
+            email_data['from'] = email_data.pop('sender')
+            if row[-1] is not None:
+                email_data['score'] = -row[-1]  # bm25 is lower-is-better
+            results.append(email_data)
+        return results
+
+    def remove(self, account, folder, uids):
+        """Drop emails by UID (expunged on the server)"""
+        with self.connection() as conn:
+            conn.executemany("DELETE FROM emails WHERE key = ?",
+                             [(f"{account}|{folder}|{uid}",) for uid in uids])
+
+    def remove_folder(self, account, folder):
+        """Drop a folder's emails (its UIDVALIDITY changed)"""
+        with self.connection() as conn:
+            conn.execute("DELETE FROM emails WHERE account = ? AND folder = ?", (account, folder))
+
+    def count(self):
+        """Number of indexed emails"""
+        return self.connection().execute("SELECT COUNT(*) FROM emails").fetchone()[0]
+
+    def clear(self):
+        """Remove every indexed email"""
+        with self.connection() as conn:
+            conn.execute("DELETE FROM emails")
+            conn.execute("INSERT INTO emails_fts (emails_fts) VALUES ('rebuild')")
+
+
+def _match_expression(query):
+    """Turn free text into an FTS5 query: every word must appear, "word*" matches prefixes"""
+    if not query:
+        return None
+    terms = []
+    for word in re.findall(r"[\w@.'-]+\*?", query):
+        prefix = word.endswith("*")
+        word = word.rstrip("*").replace('"', '')
+        if word:
+            terms.append(f'"{word}"' + ("*" if prefix else ""))
+    return " ".join(terms) or None
+
+
+def _to_epoch(value):
+    """Turn a datetime into Unix time"""
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return value
+
+
+# One index per process
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_email_index():
+    """Get the process-wide email index"""
+    global _index
+
+    with _index_lock:
+        if _index is None:
+            _index = EmailIndex()
+
+    return _index
+
+# Test
+if __name__ == "__main__":
+    print("\n" + "="*50)
+    print("Email Index Test")
+    print("="*50 + "\n")
+
+    index = EmailIndex(filename="data/email_index_demo.db")
+    index.add([
+        {'account': "me@example.com", 'folder': "INBOX", 'uid': 1, 'timestamp': 1700000000.0,
+         'subject': "Disk space warning", 'from': "alerts@example.com", 'date': "",
+         'body_preview': "Your C: drive is almost full"},
+        {'account': "me@example.com", 'folder': "INBOX", 'uid': 2, 'timestamp': 1700000600.0,
+         'subject': "Lunch?", 'from': "friend@example.com", 'date': "",
+         'body_preview': "Are you free at noon?"}
+    ])
+
+    for email_data in index.search("disk"):
+        print(f"   {email_data['score']:.2f}  {email_data['subject']} ({email_data['from']})")
+
+    index.clear()
+    index.connection().close()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(index.filename + suffix):
+            os.remove(index.filename + suffix)
+
+    print("\n✅ Email index working!\n")
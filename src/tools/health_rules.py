@@ -0,0 +1,126 @@
+# src/tools/health_rules.py - Rule-based fast path: clear-cut "Good" reports skip the LLM
+
+import os
+import sys
+import threading
+
+# Run directly (python src/tools/...): make config and tools importable
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+
+def thresholds():
+    """Current thresholds from Config as (snapshot field, label, good below, critical at)"""
+    return [
+        ('cpu_percent', "CPU", Config.CPU_GOOD_BELOW, Config.CPU_CRITICAL_AT),
+        ('mem_percent', "Memory", Config.MEM_GOOD_BELOW, Config.MEM_CRITICAL_AT),
+        ('disk_percent', "Disk", Config.DISK_GOOD_BELOW, Config.DISK_CRITICAL_AT)
+    ]
+
+
+class HealthClassifier:
+    """Classifies snapshots by threshold, counting how many skip the LLM"""
+
+    def __init__(self):
+        self.checked = 0
+        self.bypassed = 0
+        self.by_status = {'Good': 0, 'Warning': 0, 'Critical': 0}
+        self._lock = threading.Lock()
+
+    def classify(self, snapshot):
+        """
+        Classify a MetricSnapshot (or its dict)
+
+        Returns:
+            dict with status, issues (list), needs_llm and, for the fast path, analysis text
+        """
+        values = snapshot.to_dict() if hasattr(snapshot, 'to_dict') else snapshot
+
+        status = "Good"
+        issues = []
+        for field, label, good_below, critical_at in thresholds():
+            value = values.get(field)
+            if value is None:
+                continue
+            if value >= critical_at:
+                status = "Critical"
+                issues.append(f"{label} at {value:.1f}% (critical from {critical_at:g}%)")
+            elif value >= good_below:
+                status = "Warning" if status == "Good" else status
+                issues.append(f"{label} at {value:.1f}% (above {good_below:g}%)")
+
+        # Other mounted disks use the disk thresholds too
+        for partition in values.get('partitions') or []:
+            if partition['mountpoint'] == '/':
+                continue
+            value = partition['percent']
+            if value >= Config.DISK_CRITICAL_AT:
+                status = "Critical"
+                issues.append(f"Disk {partition['mountpoint']} at {value:.1f}% (critical from {Config.DISK_CRITICAL_AT:g}%)")
+            elif value >= Config.DISK_GOOD_BELOW:
+                status = "Warning" if status == "Good" else status
+                issues.append(f"Disk {partition['mountpoint']} at {value:.1f}% (above {Config.DISK_GOOD_BELOW:g}%)")
+
+        # Only clear-cut Good is answered here; borderline and critical go to the model
+        needs_llm = status != "Good"
+        result = {'status': status, 'issues': issues, 'needs_llm': needs_llm}
+        if not needs_llm:
+            result['analysis'] = format_analysis(status, issues, "No action needed - keep monitoring.")
+
+        with self._lock:
+            self.checked += 1
+            self.by_status[status] += 1
+            if not needs_llm:
+                self.bypassed += 1
+
+        return result
+
+    def stats(self):
+        """Counters for tuning the thresholds"""
+        with self._lock:
+            return {
+                'checked': self.checked,
+                'bypassed': self.bypassed,
+                'bypass_rate': self.bypassed / self.checked if self.checked else 0.0,
+                'by_status': dict(self.by_status)
+            }
+
+
+def format_analysis(status, issues, recommendation):
+    """Analysis text in the same Status / Issues / Recommendation layout the LLM is asked for"""
+    return (f"1. **Status**: {status}\n"
+            f"2. **Issues**: {'; '.join(issues) if issues else 'None'}\n"
+            f"3. **Recommendation**: {recommendation}")
+
+
+# One classifier per process
+_classifier = None
+_classifier_lock = threading.Lock()
+
+
+def get_classifier():
+    """Get the process-wide classifier (its counters cover every check)"""
+    global _classifier
+
+    with _classifier_lock:
+        if _classifier is None:
+            _classifier = HealthClassifier()
+
+    return _classifier
+
+# Test
+if __name__ == "__main__":
+    print("\n" + "="*50)
+    print("Health Rules Test")
+    print("="*50 + "\n")
+
+    classifier = HealthClassifier()
+    for sample in ({'cpu_percent': 12.0, 'mem_percent': 40.0, 'disk_percent': 55.0},
+                   {'cpu_percent': 82.0, 'mem_percent': 40.0, 'disk_percent': 55.0},
+                   {'cpu_percent': 12.0, 'mem_percent': 97.0, 'disk_percent': 91.0}):
+        result = classifier.classify(sample)
+        print(f"{result['status']:<9} LLM: {'yes' if result['needs_llm'] else 'no '}  {result['issues']}")
+
+    print(f"\nStats: {classifier.stats()}")
+    print("\n✅ Health rules working!\n")
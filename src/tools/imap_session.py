@@ -0,0 +1,276 @@
+# src/tools/imap_session.py - Persistent IMAP connections with keepalive, reconnect and IDLE
+
+import atexit
+import imaplib
+import select
+import socket
+import ssl
+import threading
+import time
+
+from config import Config
+
+# Errors that mean the connection is gone and should be reopened
+# (not every OSError: a local file error must not trigger a re-login and re-fetch)
+CONNECTION_ERRORS = (imaplib.IMAP4.abort, ConnectionError, socket.timeout, ssl.SSLError, EOFError)
+
+
+class ImapSession:
+    """One authenticated IMAP connection per account, kept alive between checks"""
+
+    def __init__(self, email_address, password, imap_server, port=None, use_ssl=True):
+        """
+        Initialize session (connects lazily)
+
+        Args:
+            email_address: Login name
+            password: App password
+            imap_server: IMAP server host
+            port: IMAP port (default: 993 with SSL, 143 without)
+            use_ssl: Use IMAP over SSL
+        """
+        self.email_address = email_address
+        self.password = password
+        self.imap_server = imap_server
+        self.port = port
+        self.use_ssl = use_ssl
+        self.mail = None
+        self.reconnects = 0
+        self._last_used = 0.0
+        self._lock = threading.RLock()
+
+    def open(self):
+        """Open and log in a new connection"""
+        timeout = Config.IMAP_TIMEOUT_SECONDS
+        if self.use_ssl:
+            mail = imaplib.IMAP4_SSL(self.imap_server, self.port or 993, timeout=timeout)
+        else:
+            mail = imaplib.IMAP4(self.imap_server, self.port or 143, timeout=timeout)
+        mail.login(self.email_address, self.password)
+        return mail
+
+    def connect(self):
+        """Connect, retrying with exponential backoff"""
+        with self._lock:
+            self.close()
+
+            delay = 1.0
+            for attempt in range(Config.IMAP_CONNECT_ATTEMPTS):
+                try:
+                    self.mail = self.open()
+                    self._last_used = time.monotonic()
+                    return self.mail
+                except imaplib.IMAP4.error as e:
+                    # Wrong credentials won't fix themselves - don't retry
+                    if not isinstance(e, imaplib.IMAP4.abort):
+                        raise
+                    last_error = e
+                except CONNECTION_ERRORS as e:
+                    last_error = e
+
+                if attempt < Config.IMAP_CONNECT_ATTEMPTS - 1:
+                    time.sleep(delay)
+                    delay = min(delay * 2, Config.IMAP_MAX_BACKOFF_SECONDS)
+
+            raise last_error
+
+    def get(self):
+        """Get a live connection (NOOP if it sat idle, reconnect if it died)"""
+        with self._lock:
+            if self.mail is None:
+                return self.connect()
+
+            idle_for = time.monotonic() - self._last_used
+            if idle_for > Config.IMAP_KEEPALIVE_SECONDS:
+                try:
+                    self.mail.noop()
+                    self._last_used = time.monotonic()
+                except CONNECTION_ERRORS:
+                    self.reconnects += 1
+                    return self.connect()
+
+            return self.mail
+
+    def run(self, func):
+        """Run func(mail) on a live connection, reconnecting once if it dropped"""
+        with self._lock:
+            try:
+                result = func(self.get())
+            except CONNECTION_ERRORS:
+                self.reconnects += 1
+                result = func(self.connect())
+
+            self._last_used = time.monotonic()
+            return result
+
+    def close(self):
+        """Log out (errors ignored)"""
+        with self._lock:
+            if self.mail is None:
+                return
+            try:
+                self.mail.logout()
+            except Exception:
+                pass
+            self.mail = None
+
+    def watch(self, folder, on_new_mail):
+        """Start an IdleWatcher on its own connection (IDLE blocks the connection)"""
+        watcher = IdleWatcher(
+            ImapSession(self.email_address, self.password, self.imap_server, self.port, self.use_ssl),
+            folder,
+            on_new_mail
+        )
+        return watcher.start()
+
+
+class IdleWatcher:
+    """Background thread that waits for new mail with IMAP IDLE (or NOOP polling)"""
+
+    def __init__(self, session, folder, on_new_mail):
+        """
+        Initialize watcher
+
+        Args:
+            session: ImapSession used only by this watcher
+            folder: Folder to watch
+            on_new_mail: Called with the folder name when mail arrives
+        """
+        self.session = session
+        self.folder = folder
+        self.on_new_mail = on_new_mail
+        self.events = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start watching"""
+        self._thread = threading.Thread(target=self._run, name=f"imap-idle-{self.folder}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop watching and log out"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        self.session.close()
+
+    def _run(self):
+        """Watch loop, reconnecting with backoff on errors"""
+        delay = 1.0
+
+        while not self._stop.is_set():
+            try:
+                mail = self.session.connect()
+                mail.select(self.folder, readonly=True)
+                delay = 1.0
+
+                while not self._stop.is_set():
+                    if "IDLE" in mail.capabilities:
+                        has_new_mail = idle_wait(mail, Config.IMAP_IDLE_SECONDS, self._stop)
+                    else:
+                        has_new_mail = poll_wait(mail, self.folder, Config.IMAP_KEEPALIVE_SECONDS, self._stop)
+
+                    if has_new_mail:
+                        self.events += 1
+                        self.on_new_mail(self.folder)
+            except Exception as e:
+                if self._stop.is_set():
+                    return
+                print(f"❌ IDLE watcher error ({self.folder}): {e}")
+                self._stop.wait(delay)
+                delay = min(delay * 2, Config.IMAP_MAX_BACKOFF_SECONDS)
+
+
+def idle_wait(mail, timeout, stop_event):
+    """
+    Run one IMAP IDLE command (imaplib has no IDLE before Python 3.14)
+
+    Returns:
+        True if the server reported new messages
+    """
+    # While idling we read the socket directly; imaplib's buffer is empty
+    # because every earlier command was read up to its tagged response.
+    tag = mail._new_tag()
+    mail.send(tag + b" IDLE\r\n")
+    sock = mail.sock
+
+    buffer = b""
+    has_new_mail = False
+    done_sent = False
+    deadline = time.monotonic() + timeout
+
+    try:
+        while True:
+            if not done_sent and (has_new_mail or stop_event.is_set() or time.monotonic() >= deadline):
+                mail.send(b"DONE\r\n")
+                done_sent = True
+
+            # SSL sockets may hold decrypted bytes that select() can't see
+            pending = getattr(sock, 'pending', lambda: 0)()
+            if not pending:
+                readable, _, _ = select.select([sock], [], [], 0.5)
+                if not readable:
+                    continue
+
+            chunk = sock.recv(4096)
+            if not chunk:
+                raise imaplib.IMAP4.abort("connection closed during IDLE")
+            buffer += chunk
+
+            while b"\r\n" in buffer:
+                line, buffer = buffer.split(b"\r\n", 1)
+                if line.startswith(tag):
+                    if b" OK" not in line:
+                        raise imaplib.IMAP4.error(line.decode(errors="ignore"))
+                    return has_new_mail
+                if line.startswith(b"*") and line.upper().endswith(b"EXISTS"):
+                    has_new_mail = True
+    finally:
+        mail.tagged_commands.pop(tag, None)
+
+
+def poll_wait(mail, folder, interval, stop_event):
+    """Fallback for servers without IDLE: compare the message count after a pause"""
+    _, data = mail.select(folder, readonly=True)
+    before = int(data[0] or 0)
+
+    stop_event.wait(interval)
+
+    _, data = mail.select(folder, readonly=True)
+    return int(data[0] or 0) > before
+
+
+# One session per account
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(email_address, password, imap_server, port=None, use_ssl=True, channel=None):
+    """
+    Get the process-wide session for an account
+
+    Args:
+        channel: Name for an extra connection to the same account
+                 (e.g. one per folder, so folders can be fetched in parallel)
+    """
+    key = (email_address, imap_server, port, use_ssl, channel)
+
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None or session.password != password:
+            session = _sessions[key] = ImapSession(email_address, password, imap_server, port, use_ssl)
+
+    return session
+
+
+def close_all_sessions():
+    """Log out of every session"""
+    with _sessions_lock:
+        sessions = list(_sessions.values())
+    for session in sessions:
+        session.close()
+
+
+atexit.register(close_all_sessions)
@@ -0,0 +1,170 @@
+# src/tools/llm_cache.py - Cache of LLM responses keyed on model, prompt and sampling parameters
+
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+# Run directly (python src/tools/...): make config and tools importable
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+
+class LLMCache:
+    """LRU + TTL cache of completion texts, optionally saved to disk"""
+
+    def __init__(self, max_size=None, ttl_seconds=None, filename=None):
+        """
+        Initialize cache
+
+        Args:
+            max_size: Most responses kept (least recently used are evicted)
+            ttl_seconds: Responses older than this are not reused
+            filename: JSON file the cache is saved to (default: Config.LLM_CACHE_FILE, "" = memory only)
+        """
+        self.max_size = max_size or Config.LLM_CACHE_SIZE
+        self.ttl_seconds = ttl_seconds or Config.LLM_CACHE_TTL_SECONDS
+        self.filename = Config.LLM_CACHE_FILE if filename is None else filename
+        self.entries = OrderedDict()  # key -> (created at, text, seconds the call took)
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self.load()
+
+    @staticmethod
+    def make_key(model, messages, **params):
+        """Hash of everything that changes the response"""
+        payload = json.dumps([model, messages, params], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key):
+        """Get a fresh cached response text (marks it recently used), or None"""
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None and time.time() - entry[0] > self.ttl_seconds:
+                del self.entries[key]
+                self._dirty = True
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+            self.saved_seconds += entry[2]
+            return entry[1]
+
+    def put(self, key, text, seconds=0.0):
+        """Cache a response, evicting the least recently used ones, and save"""
+        with self._lock:
+            self.entries[key] = (time.time(), text, seconds)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+            self._dirty = True
+        self.save()
+
+    def stats(self):
+        """Hit/miss counters and time saved"""
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'saved_seconds': self.saved_seconds
+        }
+
+    def load(self):
+        """Read unexpired responses from the cache file"""
+        if not self.filename:
+            return
+        try:
+            with open(self.filename, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            self.entries = OrderedDict(
+                (key, tuple(entry)) for key, entry in data if entry[0] >= cutoff
+            )
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def save(self):
+        """Write the cache file atomically (skipped if nothing changed or memory only)
+
+        Errors are only reported: the cache is an optimization, and a failed write
+        must not lose the answer the caller just received.
+        """
+        # One writer at a time, so an older copy never replaces a newer one
+        with self._save_lock:
+            with self._lock:
+                if not self.filename or not self._dirty:
+                    return
+                self._dirty = False
+                data = list(self.entries.items())
+
+            # Temp name per process, in case the dashboard and main.py save at once
+            temp_name = f"{self.filename}.{os.getpid()}.tmp"
+            try:
+                os.makedirs(os.path.dirname(self.filename) or ".", exist_ok=True)
+                with open(temp_name, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False)
+                os.replace(temp_name, self.filename)
+            except OSError as e:
+                print(f"❌ Could not save LLM cache: {e}")
+                with self._lock:
+                    self._dirty = True
+
+    def clear(self):
+        """Forget every response"""
+        with self._lock:
+            self.entries.clear()
+            self._dirty = True
+        self.save()
+
+
+# One cache per process
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache():
+    """Get the process-wide LLM response cache"""
+    global _cache
+
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMCache()
+
+    return _cache
+
+# Test
+if __name__ == "__main__":
+    print("\n" + "="*50)
+    print("LLM Cache Test")
+    print("="*50 + "\n")
+
+    cache = LLMCache(max_size=2, ttl_seconds=60, filename="")
+    messages = [{"role": "user", "content": "Analyze: CPU 95%"}]
+    key = cache.make_key("local-model", messages, temperature=0.7, max_tokens=250)
+    cache.put(key, "Status: Warning", seconds=4.2)
+
+    start = time.perf_counter()
+    text = cache.get(key)
+    print(f"Hit: {text!r} in {(time.perf_counter() - start) * 1e6:.1f} µs")
+    print(f"Other temperature cached: {cache.get(cache.make_key('local-model', messages, temperature=0.2)) is not None}")
+    print(f"Stats: {cache.stats()}")
+
+    print("\n✅ LLM cache working!\n")
@@ -0,0 +1,234 @@
+# src/tools/llm_service.py - Shared LM Studio client: pooled connections, fair queuing, timeouts
+
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+import httpx
+from openai import OpenAI
+
+# Run directly (python src/tools/...): make config and tools importable
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from tools.health_rules import get_classifier
+from tools.llm_cache import get_llm_cache
+from tools.llm_stream import CompletionStream
+
+# Prompt for a system health report (used by the dashboard and main.py)
+SYSTEM_PROMPT = """Analyze this PC health report and provide recommendations:
+
+{report}
+
+Please provide:
+1. **Status**: Good/Warning/Critical (one word)
+2. **Issues**: List any problems found (or "None")
+3. **Recommendation**: One specific action to take
+
+Be concise and actionable."""
+
+SYSTEM_PARAMS = {'temperature': 0.7, 'max_tokens': 250}
+
+# Added after the report when history is available (see trend_context.py)
+HISTORY_SECTION = """{report}
+
+Recent history (use it to tell a passing spike from a lasting trend):
+{context}"""
+
+
+class QueueTimeout(Exception):
+    """Waited too long for a free LLM slot"""
+
+
+class FairSemaphore:
+    """Semaphore that hands out slots in arrival order (threading.Semaphore doesn't)"""
+
+    def __init__(self, slots):
+        self.slots = slots
+        self.in_use = 0
+        self.peak = 0
+        self._waiting = deque()
+        self._condition = threading.Condition()
+
+    def acquire(self, timeout=None):
+        """Wait for a slot; raises QueueTimeout if none frees up in time"""
+        ticket = object()
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._condition:
+            self._waiting.append(ticket)
+            try:
+                # Only the oldest waiter may take a free slot
+                while self._waiting[0] is not ticket or self.in_use >= self.slots:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise QueueTimeout(f"no free LLM slot after {timeout:.0f}s")
+                    self._condition.wait(remaining)
+            finally:
+                self._waiting.remove(ticket)
+                self._condition.notify_all()
+
+            self.in_use += 1
+            self.peak = max(self.peak, self.in_use)
+
+    def release(self):
+        """Give a slot back"""
+        with self._condition:
+            self.in_use -= 1
+            self._condition.notify_all()
+
+    @property
+    def queued(self):
+        """Requests waiting for a slot"""
+        return len(self._waiting)
+
+
+class Slot:
+    """Context manager holding one FairSemaphore slot"""
+
+    def __init__(self, semaphore, timeout):
+        self.semaphore = semaphore
+        self.timeout = timeout
+
+    def __enter__(self):
+        self.semaphore.acquire(self.timeout)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.semaphore.release()
+
+
+class AnalysisService:
+    """One pooled OpenAI client for every entry point, at most N requests on the server at once"""
+
+    def __init__(self, base_url=None, model=None, max_concurrency=None, cache=None):
+        """
+        Initialize service
+
+        Args:
+            base_url: LM Studio URL (default: Config.LLM_BASE_URL)
+            model: Model name sent with requests (default: Config.LLM_MODEL)
+            max_concurrency: Requests sent to the server at the same time (the rest queue)
+            cache: LLMCache for responses (default: shared cache, False: none)
+        """
+        self.base_url = base_url or Config.LLM_BASE_URL
+        self.model = model or Config.LLM_MODEL
+        self.max_concurrency = max_concurrency or Config.LLM_MAX_CONCURRENCY
+        self.cache = get_llm_cache() if cache is None else cache
+        self.classifier = get_classifier()
+        self.semaphore = FairSemaphore(self.max_concurrency)
+        self.requests = 0
+
+        # Keep-alive pool sized to the concurrency limit
+        self.http_client = httpx.Client(
+            limits=httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.max_concurrency
+            ),
+            timeout=httpx.Timeout(Config.LLM_TIMEOUT_SECONDS, connect=Config.LLM_CONNECT_TIMEOUT_SECONDS)
+        )
+
+        # The OpenAI client retries connection errors, 429 and 5xx with backoff
+        self.client = OpenAI(
+            base_url=self.base_url,
+            api_key="not-needed",
+            http_client=self.http_client,
+            max_retries=Config.LLM_MAX_RETRIES
+        )
+
+    def slot(self):
+        """Context manager for one request slot (waits in FIFO order)"""
+        return Slot(self.semaphore, Config.LLM_QUEUE_TIMEOUT_SECONDS)
+
+    def complete(self, messages, use_cache=True, **params):
+        """Get a full completion text (cached responses skip the queue)"""
+        cache = self.cache if use_cache else None
+        key = cache.make_key(self.model, messages, **params) if cache else None
+
+        if cache:
+            text = cache.get(key)
+            if text is not None:
+                return text
+
+        with self.slot():
+            self.requests += 1
+            start = time.perf_counter()
+            response = self.client.chat.completions.create(model=self.model, messages=messages, **params)
+            text = response.choices[0].message.content
+
+        if cache:
+            cache.put(key, text, time.perf_counter() - start)
+        return text
+
+    def stream(self, messages, **params):
+        """CompletionStream that holds a slot while it runs"""
+        self.requests += 1
+        return CompletionStream(self.client, self.model, messages, gate=self.slot(), **params)
+
+    def system_messages(self, report, context=None):
+        """Chat messages asking for a system report analysis (context: trend summary)"""
+        if context:
+            report = HISTORY_SECTION.format(report=report, context=context)
+        return [{"role": "user", "content": SYSTEM_PROMPT.format(report=report)}]
+
+    def analyze_system(self, report, snapshot=None, context=None, use_cache=True):
+        """Analyze a system health report (clear-cut Good snapshots are answered by rules)"""
+        if snapshot is not None:
+            verdict = self.classifier.classify(snapshot)
+            if not verdict['needs_llm']:
+                return verdict['analysis']
+        return self.complete(self.system_messages(report, context), use_cache=use_cache, **SYSTEM_PARAMS)
+
+    def stats(self):
+        """Concurrency counters"""
+        return {
+            'in_flight': self.semaphore.in_use,
+            'queued': self.semaphore.queued,
+            'peak': self.semaphore.peak,
+            'max_concurrency': self.max_concurrency,
+            'requests': self.requests
+        }
+
+    def close(self):
+        """Close pooled connections"""
+        self.http_client.close()
+
+
+# One service per process
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_analysis_service():
+    """Get the process-wide analysis service"""
+    global _service
+
+    with _service_lock:
+        if _service is None:
+            _service = AnalysisService()
+
+    return _service
+
+# Test
+if __name__ == "__main__":
+    from concurrent.futures import ThreadPoolExecutor
+
+    print("\n" + "="*50)
+    print("Analysis Service Test")
+    print("="*50 + "\n")
+
+    service = AnalysisService(max_concurrency=2, cache=False)
+    messages = [{"role": "user", "content": "Say hello in one sentence."}]
+
+    try:
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            answers = list(pool.map(lambda _: service.complete(messages, max_tokens=50), range(6)))
+        print(f"AI said: {answers[0]}")
+        print(f"Stats: {service.stats()}")
+        print("\n✅ Analysis service working!\n")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        print("Make sure LM Studio server is running!")
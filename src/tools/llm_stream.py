@@ -0,0 +1,111 @@
+# src/tools/llm_stream.py - Streamed chat completions with time-to-first-token and tokens/sec
+
+import contextlib
+import time
+
+class CompletionStream:
+    """Iterates over the text pieces of a streamed completion, timing them as they arrive"""
+
+    def __init__(self, client, model, messages, gate=None, **params):
+        """
+        Start a streamed completion
+
+        Args:
+            client: OpenAI client
+            model: Model name
+            messages: Chat messages
+            gate: Context manager held while the stream runs (e.g. a concurrency slot)
+            **params: Sampling parameters (temperature, max_tokens, ...)
+        """
+        self.client = client
+        self.gate = gate or contextlib.nullcontext()
+        self.model = model
+        self.messages = messages
+        self.params = params
+        self.text = ""
+        self.done = False
+        self.started_at = None
+        self.first_token_at = None
+        self.finished_at = None
+        self.tokens = 0
+        self._usage_tokens = None
+
+    def __iter__(self):
+        """Yield text pieces; text, stats and done are set once the stream is exhausted"""
+        with self.gate:
+            self.started_at = time.perf_counter()
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=self.messages,
+                stream=True,
+                stream_options={"include_usage": True},
+                **self.params
+            )
+
+            pieces = []
+            for chunk in response:
+                if getattr(chunk, 'usage', None) and chunk.usage.completion_tokens:
+                    self._usage_tokens = chunk.usage.completion_tokens
+                if not chunk.choices:
+                    continue
+
+                piece = chunk.choices[0].delta.content
+                if not piece:
+                    continue
+                if self.first_token_at is None:
+                    self.first_token_at = time.perf_counter()
+
+                # One content chunk is one token on OpenAI-compatible servers
+                self.tokens += 1
+                pieces.append(piece)
+                yield piece
+
+            self.finished_at = time.perf_counter()
+
+        self.text = "".join(pieces)
+        if self._usage_tokens:
+            self.tokens = self._usage_tokens
+        self.done = True
+
+    def stats(self):
+        """Time to first token, total time and generation speed (seconds / tokens per second)"""
+        if self.started_at is None:
+            return {}
+
+        end = self.finished_at or time.perf_counter()
+        first = self.first_token_at or end
+        generating = end - first
+        return {
+            'ttft_seconds': round(first - self.started_at, 4),
+            'total_seconds': round(end - self.started_at, 4),
+            'tokens': self.tokens,
+            # The first token is counted in TTFT, the rest in the generation rate
+            'tokens_per_second': round((self.tokens - 1) / generating, 2) if self.tokens > 1 and generating > 0 else None
+        }
+
+# Test
+if __name__ == "__main__":
+    import os
+    import sys
+
+    from openai import OpenAI
+
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from config import Config
+
+    print("\n" + "="*50)
+    print("Streaming Completion Test")
+    print("="*50 + "\n")
+
+    client = OpenAI(base_url=Config.LLM_BASE_URL, api_key="not-needed")
+    stream = CompletionStream(client, "local-model", [{"role": "user", "content": "Say hello in one sentence."}],
+                              temperature=0.7, max_tokens=50)
+
+    try:
+        for piece in stream:
+            print(piece, end="", flush=True)
+        print(f"\n\n{stream.stats()}")
+        print("\n✅ Streaming working!\n")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        print("Make sure LM Studio server is running!")
@@ -0,0 +1,311 @@
+# src/tools/metrics_archive.py - Columnar (Parquet) archive of metric samples
+
+import atexit
+import os
+import queue
+import shutil
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+# Run directly (python src/tools/...): make config and tools importable
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+
+# Columns stored for every sample
+SCHEMA = pa.schema([
+    ('timestamp', pa.float64()),
+    ('cpu_percent', pa.float32()),
+    ('mem_used', pa.int64()),
+    ('mem_total', pa.int64()),
+    ('mem_percent', pa.float32()),
+    ('disk_used', pa.int64()),
+    ('disk_total', pa.int64()),
+    ('disk_percent', pa.float32()),
+    ('cpu_max_core', pa.float32()),
+    ('disk_read_rate', pa.float64()),
+    ('disk_write_rate', pa.float64()),
+    ('net_sent_rate', pa.float64()),
+    ('net_recv_rate', pa.float64()),
+    ('source', pa.string())
+])
+
+COLUMNS = [field.name for field in SCHEMA]
+
+PARTITIONING = ds.partitioning(pa.schema([('date', pa.string())]), flavor="hive")
+DATASET_SCHEMA = SCHEMA.append(pa.field('date', pa.string()))
+
+
+class MetricsArchive:
+    """Metric samples in day-partitioned Parquet files, written in batches on a writer thread"""
+
+    def __init__(self, root=None, batch_size=None):
+        """
+        Initialize archive
+
+        Args:
+            root: Archive folder (default: Config.ARCHIVE_DIR)
+            batch_size: Samples buffered before a file is written
+        """
+        self.root = root or Config.ARCHIVE_DIR
+        self.batch_size = batch_size or Config.ARCHIVE_BATCH_SIZE
+        self._buffer = {name: [] for name in COLUMNS}
+        self._pending = []  # full batches waiting for the writer thread
+        self._compacted_day = None
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+    def append(self, sample, source="sampler"):
+        """Buffer one sample (MetricSnapshot or dict); full batches are written on the writer thread"""
+        if hasattr(sample, 'to_dict'):
+            sample = sample.to_dict()
+
+        with self._lock:
+            for name in COLUMNS[:-1]:
+                self._buffer[name].append(sample.get(name))
+            self._buffer['source'].append(source)
+            if len(self._buffer['timestamp']) < self.batch_size:
+                return
+            batch = self._take_buffer()
+
+        # Sampler listener: never block the 1 s reading on Parquet I/O
+        self._start()
+        self._queue.put(batch)
+
+    def _take_buffer(self):
+        """Swap out the buffer (caller holds _lock); it stays visible to scans until written"""
+        batch = self._buffer
+        self._buffer = {name: [] for name in COLUMNS}
+        if batch['timestamp']:
+            self._pending.append(batch)
+        return batch
+
+    def _start(self):
+        """Start the writer thread on first use"""
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="archive-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        """Writer loop"""
+        while True:
+            batch = self._queue.get()
+            try:
+                self._write(batch)
+            except Exception as e:
+                print(f"❌ Archive write failed: {e}")
+            finally:
+                self._queue.task_done()
+
+    def flush(self):
+        """Write buffered samples now, one Parquet file per day (waits for queued batches too)"""
+        with self._lock:
+            batch = self._take_buffer()
+        self._queue.join()
+        return self._write(batch)
+
+    def _write(self, batch):
+        """Write one batch, one Parquet file per day"""
+        if not batch['timestamp']:
+            return 0
+
+        table = pa.table(batch, schema=SCHEMA)
+        days = np.array([_day_of(ts) for ts in batch['timestamp']])
+
+        with self._write_lock:
+            try:
+                for day in np.unique(days):
+                    folder = os.path.join(self.root, f"date={day}")
+                    os.makedirs(folder, exist_ok=True)
+                    part = table.filter(pa.array(days == day))
+                    name = f"part-{time.time_ns()}.parquet"
+                    pq.write_table(part, os.path.join(folder, name), compression="zstd")
+            finally:
+                with self._lock:
+                    self._pending = [pending for pending in self._pending if pending is not batch]
+
+            # Finished days are merged once per day rollover (and once after startup)
+            today = _day_of(time.time())
+            if today != self._compacted_day:
+                self.compact_old_days()
+                self._compacted_day = today
+
+        return table.num_rows
+
+    def compact_old_days(self):
+        """Merge the many batch files of finished days into one file per day"""
+        today = f"date={_day_of(time.time())}"
+
+        for folder in os.listdir(self.root):
+            path = os.path.join(self.root, folder)
+            if folder == today or not folder.startswith("date=") or not os.path.isdir(path):
+                continue
+
+            parts = [name for name in os.listdir(path) if name.endswith(".parquet")]
+            if len(parts) <= 1:
+                continue
+
+            table = pa.concat_tables(
+                pq.read_table(os.path.join(path, name), schema=SCHEMA) for name in parts
+            ).sort_by('timestamp')
+
+            # Write the merged file first ("_" keeps it hidden from scans), then drop the pieces
+            temp_name = os.path.join(path, "_merged.tmp")
+            pq.write_table(table, temp_name, compression="zstd")
+            os.replace(temp_name, os.path.join(path, f"part-{time.time_ns()}-merged.parquet"))
+            for name in parts:
+                os.remove(os.path.join(path, name))
+
+    def scan(self, start=None, end=None, columns=('timestamp', 'cpu_percent'), source=None):
+        """
+        Read samples in a time range as NumPy arrays
+
+        Args:
+            start: datetime or Unix time (default: beginning)
+            end: datetime or Unix time (default: now)
+            columns: Columns to read
+            source: Only samples from this source ("sampler" / "analysis")
+
+        Returns:
+            dict of column name -> NumPy array (sorted by time if timestamp is asked for)
+        """
+        start = _to_epoch(start)
+        end = _to_epoch(end)
+        columns = list(columns)
+        read_columns = columns if 'timestamp' in columns else columns + ['timestamp']
+
+        # Partition pruning on the date folder, then row filtering
+        condition = None
+        if start is not None:
+            condition = (ds.field('date') >= _day_of(start)) & (ds.field('timestamp') >= start)
+        if end is not None:
+            upper = (ds.field('date') <= _day_of(end)) & (ds.field('timestamp') <= end)
+            condition = upper if condition is None else condition & upper
+        if source:
+            by_source = ds.field('source') == source
+            condition = by_source if condition is None else condition & by_source
+
+        tables = []
+        with self._write_lock:
+            if any(name.startswith("date=") for name in os.listdir(self.root)):
+                dataset = ds.dataset(
+                    self.root,
+                    format="parquet",
+                    partitioning=PARTITIONING,
+                    schema=DATASET_SCHEMA
+                )
+                tables.append(dataset.to_table(columns=read_columns, filter=condition))
+
+            # Samples not written yet: the buffer and batches queued for the writer thread
+            with self._lock:
+                batches = self._pending + [self._buffer]
+                pending = {name: [value for batch in batches for value in batch[name]] for name in COLUMNS}
+        if pending['timestamp']:
+            table = pa.table(pending, schema=SCHEMA)
+            if condition is not None:
+                table = table.append_column('date', pa.array([_day_of(ts) for ts in pending['timestamp']]))
+                table = ds.dataset(table).to_table(filter=condition)
+            tables.append(table.select(read_columns))
+
+        if not tables:
+            return {name: np.array([]) for name in columns}
+
+        table = pa.concat_tables(tables)
+        if 'timestamp' in columns:
+            table = table.sort_by('timestamp')
+        return {name: table.column(name).to_numpy(zero_copy_only=False) for name in columns}
+
+    def aggregate(self, metric="cpu_percent", start=None, end=None, source=None):
+        """min/mean/max and percentiles of one metric over a time range"""
+        values = self.scan(start, end, columns=[metric], source=source)[metric]
+        values = values[~np.isnan(values)] if values.dtype.kind == 'f' else values
+
+        if values.size == 0:
+            return {'count': 0}
+
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        return {
+            'count': int(values.size),
+            'min': float(values.min()),
+            'mean': float(values.mean()),
+            'max': float(values.max()),
+            'p50': float(p50),
+            'p95': float(p95),
+            'p99': float(p99)
+        }
+
+    def percentile(self, metric="cpu_percent", q=95, days=30):
+        """Percentile of a metric over the last N days (e.g. p95 CPU over 30 days)"""
+        start = datetime.now() - timedelta(days=days)
+        values = self.scan(start, None, columns=[metric])[metric]
+        values = values[~np.isnan(values)] if values.dtype.kind == 'f' else values
+        return float(np.percentile(values, q)) if values.size else None
+
+    def clear(self):
+        """Remove every archived sample"""
+        with self._lock:
+            self._buffer = {name: [] for name in COLUMNS}
+            self._pending = []
+        with self._write_lock:
+            shutil.rmtree(self.root, ignore_errors=True)
+            os.makedirs(self.root, exist_ok=True)
+
+
+def _day_of(timestamp):
+    """Partition key (local date) for a Unix time"""
+    return datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d')
+
+
+def _to_epoch(value):
+    """Turn a datetime into Unix time"""
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return value
+
+
+# One archive per process
+_archive = None
+_archive_lock = threading.Lock()
+
+
+def get_archive():
+    """Get the process-wide archive (buffered samples are written at exit)"""
+    global _archive
+
+    with _archive_lock:
+        if _archive is None:
+            _archive = MetricsArchive()
+            atexit.register(_archive.flush)
+
+    return _archive
+
+# Test
+if __name__ == "__main__":
+    print("\n" + "="*50)
+    print("Metrics Archive Test")
+    print("="*50 + "\n")
+
+    archive = MetricsArchive(root="data/metrics_demo", batch_size=100)
+    now = time.time()
+    for i in range(1000):
+        archive.append({'timestamp': now - i * 60, 'cpu_percent': float(i % 100)})
+    archive.flush()
+
+    print(f"p95 CPU (1 day): {archive.aggregate('cpu_percent', now - 86400)['p95']:.1f}%")
+    archive.clear()
+    os.rmdir(archive.root)
+
+    print("\n✅ Metrics archive working!\n")
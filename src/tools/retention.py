@@ -0,0 +1,144 @@
+# src/tools/retention.py - Retention and hourly/daily rollups of history metrics
+
+from datetime import datetime, timedelta
+
+# Metrics that get min/avg/max rollups
+ROLLUP_METRICS = ('cpu_percent', 'mem_percent', 'disk_percent')
+
+RESOLUTIONS = ('hour', 'day')
+
+# Only live checks are trend samples; re-analyses, anomalies and emails would count readings twice
+TREND_TYPES = ('system',)
+
+
+def trend_metrics(entry):
+    """Metrics of an entry that counts as a trend sample (None otherwise)"""
+    if entry.get('type', 'system') not in TREND_TYPES:
+        return None
+    return entry.get('metrics')
+
+
+def bucket_of(timestamp, resolution):
+    """Start of the hour/day bucket for an ISO timestamp"""
+    if resolution == 'hour':
+        return timestamp[:13] + ":00:00"
+    return timestamp[:10] + "T00:00:00"
+
+
+def build_rollups(entries, resolution):
+    """Aggregate entries with metrics into {bucket: rollup} for one resolution"""
+    rollups = {}
+
+    for entry in entries:
+        metrics = trend_metrics(entry)
+        if not metrics:
+            continue
+
+        bucket = bucket_of(entry['timestamp'], resolution)
+        rollup = rollups.get(bucket)
+        if rollup is None:
+            rollup = rollups[bucket] = {'resolution': resolution, 'bucket': bucket, 'count': 0}
+        rollup['count'] += 1
+
+        for name in ROLLUP_METRICS:
+            value = metrics.get(name)
+            if value is None:
+                continue
+
+            stats = rollup.get(name)
+            if stats is None:
+                rollup[name] = {'min': value, 'avg': value, 'max': value, 'count': 1}
+            else:
+                stats['count'] += 1
+                stats['avg'] += (value - stats['avg']) / stats['count']
+                stats['min'] = min(stats['min'], value)
+                stats['max'] = max(stats['max'], value)
+
+    return rollups
+
+
+def merge_rollup(old, new):
+    """Combine two rollups of the same bucket"""
+    merged = {'resolution': old['resolution'], 'bucket': old['bucket'],
+              'count': old['count'] + new['count']}
+
+    for name in ROLLUP_METRICS:
+        a = old.get(name)
+        b = new.get(name)
+        if a is None or b is None:
+            if a or b:
+                merged[name] = dict(a or b)
+            continue
+
+        count = a['count'] + b['count']
+        merged[name] = {
+            'min': min(a['min'], b['min']),
+            'avg': (a['avg'] * a['count'] + b['avg'] * b['count']) / count,
+            'max': max(a['max'], b['max']),
+            'count': count
+        }
+
+    return merged
+
+
+def compact(backend, retention_days, now=None):
+    """
+    Roll up new complete hours, then drop raw entries past retention
+
+    Args:
+        backend: Storage backend (JsonlBackend or SqliteBackend)
+        retention_days: Days of raw entries to keep
+        now: Current time (default: datetime.now())
+
+    Returns:
+        (number of entries rolled up, cutoff used for deletion)
+    """
+    now = now or datetime.now()
+
+    # Only complete hours are rolled up, so each hour is aggregated once
+    rolled_until = now.replace(minute=0, second=0, microsecond=0).isoformat()
+    watermark = backend.rollup_watermark()
+
+    entries = [
+        entry for entry in backend.range(watermark, rolled_until, None)
+        if entry.get('timestamp', '') < rolled_until
+    ]
+
+    rows = []
+    for resolution in RESOLUTIONS:
+        rows.extend(build_rollups(entries, resolution).values())
+    backend.save_rollups(rows, rolled_until)
+
+    # Raw entries older than the retention window live on only as rollups
+    cutoff = (now - timedelta(days=retention_days)).isoformat()
+    backend.delete_before(min(cutoff, rolled_until))
+
+    return len(entries), cutoff
+
+
+def trend_from_entries(entries):
+    """Turn raw entries into trend points (one per entry with metrics)"""
+    points = []
+    for entry in entries:
+        metrics = trend_metrics(entry)
+        if not metrics:
+            continue
+        point = {'timestamp': entry['timestamp'], 'count': 1}
+        for name in ROLLUP_METRICS:
+            value = metrics.get(name)
+            if value is not None:
+                point[name] = {'min': value, 'avg': value, 'max': value, 'count': 1}
+        points.append(point)
+    return points
+
+
+def trend_from_rollups(rollups):
+    """Turn rollup rows into trend points"""
+    points = []
+    for rollup in rollups:
+        point = {'timestamp': rollup['bucket'], 'count': rollup['count']}
+        for name in ROLLUP_METRICS:
+            if name in rollup:
+                point[name] = rollup[name]
+        points.append(point)
+    return points
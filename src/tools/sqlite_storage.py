@@ -0,0 +1,214 @@
+# src/tools/sqlite_storage.py - SQLite history backend
+
+import json
+import os
+import sqlite3
+import threading
+
+from tools import retention
+from tools.storage import read_legacy
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    type TEXT NOT NULL,
+    entry TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_history_timestamp ON history (timestamp);
+CREATE INDEX IF NOT EXISTS idx_history_type_timestamp ON history (type, timestamp);
+CREATE TABLE IF NOT EXISTS rollups (
+    resolution TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (resolution, bucket)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Rows removed per transaction when applying retention
+DELETE_CHUNK_SIZE = 5000
+
+class SqliteBackend:
+    """History in an SQLite database (WAL mode, safe for many sessions)"""
+
+    def __init__(self, filename, legacy_filenames=()):
+        """
+        Initialize backend
+
+        Args:
+            filename: Database file
+            legacy_filenames: Old JSON/JSONL history files, imported into a new database
+        """
+        self.filename = filename
+        self._local = threading.local()
+
+        os.makedirs(os.path.dirname(self.filename) or ".", exist_ok=True)
+        is_new = not os.path.exists(self.filename)
+
+        with self.connection() as conn:
+            conn.executescript(SCHEMA)
+
+        if is_new:
+            self.migrate_legacy(legacy_filenames)
+
+    def connection(self):
+        """Get this thread's connection (opened on first use)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.filename, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def migrate_legacy(self, legacy_filenames):
+        """Import entries from the first old history file that has any"""
+        for source in legacy_filenames:
+            if source and os.path.exists(source):
+                entries = read_legacy(source)
+                if entries:
+                    self.append(entries)
+                    return len(entries)
+        return 0
+
+    def append(self, entries):
+        """Insert entries in a single transaction"""
+        rows = [
+            (entry.get('timestamp', ''), entry.get('type', 'system'),
+             json.dumps(entry, ensure_ascii=False))
+            for entry in entries
+        ]
+        with self.connection() as conn:
+            conn.executemany(
+                "INSERT INTO history (timestamp, type, entry) VALUES (?, ?, ?)",
+                rows
+            )
+
+    def signature(self):
+        """Size and mtime of the database and its WAL (changes on every commit)"""
+        signature = []
+        for name in (self.filename, self.filename + "-wal"):
+            try:
+                stat = os.stat(name)
+                signature.append((stat.st_size, stat.st_mtime_ns))
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    def load_all(self):
+        """Get every entry, oldest first"""
+        return self._query("SELECT entry FROM history ORDER BY id")
+
+    def recent(self, n):
+        """Get the last n entries, oldest first"""
+        rows = self._query("SELECT entry FROM history ORDER BY id DESC LIMIT ?", (n,))
+        rows.reverse()
+        return rows
+
+    def range(self, start, end, analysis_type):
+        """Get entries in a time range, oldest first"""
+        where, params = _filters(analysis_type, start, end)
+        return self._query(
+            f"SELECT entry FROM history {where} ORDER BY timestamp, id",
+            params
+        )
+
+    def page(self, offset, limit, analysis_type, start, end):
+        """Get `limit` matching entries after skipping `offset`, newest first"""
+        where, params = _filters(analysis_type, start, end)
+        return self._query(
+            f"SELECT entry FROM history {where} ORDER BY timestamp DESC, id DESC LIMIT ? OFFSET ?",
+            params + [limit, offset]
+        )
+
+    def count(self, analysis_type, start, end):
+        """Count matching entries"""
+        where, params = _filters(analysis_type, start, end)
+        row = self.connection().execute(f"SELECT COUNT(*) FROM history {where}", params).fetchone()
+        return row[0]
+
+    def clear(self):
+        """Remove all entries and rollups"""
+        with self.connection() as conn:
+            conn.execute("DELETE FROM history")
+            conn.execute("DELETE FROM rollups")
+            conn.execute("DELETE FROM meta WHERE key = 'rolled_until'")
+
+    def delete_before(self, cutoff):
+        """Drop entries older than cutoff, in small transactions"""
+        deleted = 0
+        while True:
+            with self.connection() as conn:
+                cursor = conn.execute(
+                    "DELETE FROM history WHERE id IN "
+                    "(SELECT id FROM history WHERE timestamp < ? LIMIT ?)",
+                    (cutoff, DELETE_CHUNK_SIZE)
+                )
+            deleted += cursor.rowcount
+            if cursor.rowcount < DELETE_CHUNK_SIZE:
+                return deleted
+
+    def rollup_watermark(self):
+        """Timestamp up to which entries have been rolled up (None if never)"""
+        row = self.connection().execute(
+            "SELECT value FROM meta WHERE key = 'rolled_until'"
+        ).fetchone()
+        return row[0] if row else None
+
+    def load_rollups(self, resolution, start, end):
+        """Get rollup rows of one resolution with start <= bucket <= end"""
+        cursor = self.connection().execute(
+            "SELECT data FROM rollups WHERE resolution = ? AND bucket >= ? AND bucket <= ? "
+            "ORDER BY bucket",
+            (resolution, start or "", end or "9999")
+        )
+        return [json.loads(row[0]) for row in cursor]
+
+    def save_rollups(self, rows, rolled_until):
+        """Merge rollup rows and move the watermark in one transaction"""
+        with self.connection() as conn:
+            for row in rows:
+                old = conn.execute(
+                    "SELECT data FROM rollups WHERE resolution = ? AND bucket = ?",
+                    (row['resolution'], row['bucket'])
+                ).fetchone()
+                if old:
+                    row = retention.merge_rollup(json.loads(old[0]), row)
+
+                conn.execute(
+                    "INSERT OR REPLACE INTO rollups (resolution, bucket, data) VALUES (?, ?, ?)",
+                    (row['resolution'], row['bucket'], json.dumps(row))
+                )
+
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('rolled_until', ?)",
+                (rolled_until,)
+            )
+
+    def _query(self, sql, params=()):
+        """Run a SELECT of entry JSON and decode the rows"""
+        cursor = self.connection().execute(sql, params)
+        return [json.loads(row[0]) for row in cursor]
+
+
+def _filters(analysis_type, start, end):
+    """Build a WHERE clause for the common filters"""
+    clauses = []
+    params = []
+
+    if analysis_type:
+        clauses.append("type = ?")
+        params.append(analysis_type)
+    if start:
+        clauses.append("timestamp >= ?")
+        params.append(start)
+    if end:
+        clauses.append("timestamp <= ?")
+        params.append(end)
+
+    where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+    return where, params
@@ -2,83 +2,843 @@
 
 import json
 import os
-from datetime import datetime
+import shutil
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+# Run directly (python src/tools/...): make config and tools importable
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from tools import retention
+
+# Default JSON Lines history file
+JSONL_FILENAME = "data/history.jsonl"
+
+# Bytes read per step when scanning the log from the end
+TAIL_BLOCK_SIZE = 64 * 1024
 
 class Storage:
-    """Simple JSON storage for analysis history"""
-    
-    def __init__(self, filename="data/history.json"):
+    """Analysis history, kept in a pluggable backend (JSON Lines or SQLite)"""
+
+    def __init__(self, filename=None, backend=None, legacy_filename="data/history.json", archive=None):
+        """
+        Initialize storage
+
+        Args:
+            filename: History file (default depends on backend)
+            backend: "jsonl" or "sqlite" (default: Config.STORAGE_BACKEND)
+            legacy_filename: Old JSON array file, imported once if present
+            archive: MetricsArchive that also receives saved metrics (optional)
+        """
+        self.archive = archive
+        backend = backend or Config.STORAGE_BACKEND
+
+        if backend == "jsonl":
+            self.backend = JsonlBackend(filename or JSONL_FILENAME, legacy_filename)
+        elif backend == "sqlite":
+            from tools.sqlite_storage import SqliteBackend
+            # A new database picks up whatever file history lived in before
+            legacy = [legacy_filename, JSONL_FILENAME] if legacy_filename else []
+            self.backend = SqliteBackend(filename or Config.SQLITE_PATH, legacy)
+        else:
+            raise ValueError(f"Unknown storage backend: {backend}")
+
+        self.filename = self.backend.filename
+
+        # Background compaction state
+        self._compact_lock = threading.Lock()
+        self._last_compaction = 0.0
+
+        # Parsed history kept in memory, checked against the file signature
+        self._cache = None
+        self._cache_signature = None
+        self._cache_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def save_analysis(self, analysis_type, report, analysis, metrics=None, llm=None):
+        """
+        Save an analysis to history
+
+        Args:
+            analysis_type: Kind of check (e.g. "system")
+            report: Text report shown to the user
+            analysis: AI analysis text
+            metrics: Numeric readings (e.g. MetricSnapshot.to_dict())
+            llm: Timing of the AI call (e.g. CompletionStream.stats())
+        """
+        entry = make_entry(analysis_type, report, analysis, metrics, llm=llm)
+        self._append([entry])
+        self._archive_metrics([entry])
+        self.schedule_compaction()
+        return True
+
+    def save_many(self, entries):
+        """Save several entries in one write (dicts with type/report/analysis/metrics/llm)"""
+        batch = [
+            make_entry(
+                entry.get('type', 'system'),
+                entry.get('report'),
+                entry.get('analysis'),
+                entry.get('metrics'),
+                entry.get('timestamp'),
+                entry.get('llm')
+            )
+            for entry in entries
+        ]
+        if batch:
+            self._append(batch)
+            self._archive_metrics(batch)
+            self.schedule_compaction()
+        return len(batch)
+
+    def log_anomaly(self, anomalies, report, analysis="", metrics=None):
+        """
+        Record unusual readings in the history (type "anomaly")
+
+        Args:
+            anomalies: Event dicts from AnomalyDetector.update()
+            report: Text report at the time of the anomaly
+            analysis: AI analysis text ("" if none was made)
+            metrics: Numeric readings (e.g. MetricSnapshot.to_dict())
+        """
+        entry = make_entry("anomaly", report, analysis, metrics)
+        entry['anomalies'] = anomalies
+        self._append([entry])
+        self._archive_metrics([entry])
+        self.schedule_compaction()
+        return True
+
+    def get_anomalies(self, start=None, end=None):
+        """Get logged anomalies in a time range, oldest first"""
+        return self.get_range(start, end, analysis_type="anomaly")
+
+    def _append(self, entries):
+        """Write entries and keep the cached history in step"""
+        with self._cache_lock:
+            cache_valid = (
+                self._cache is not None
+                and self.backend.signature() == self._cache_signature
+            )
+            self.backend.append(entries)
+
+            if cache_valid:
+                self._cache.extend(entries)
+                self._cache_signature = self.backend.signature()
+            else:
+                self._cache = None
+
+    def _archive_metrics(self, entries):
+        """Copy numeric metrics of saved entries into the columnar archive"""
+        if self.archive is None:
+            return
+
+        for entry in entries:
+            metrics = retention.trend_metrics(entry)
+            if metrics and 'timestamp' in metrics:
+                self.archive.append(metrics, source="analysis")
+
+    def load_history(self):
+        """Load history (served from memory while the file is unchanged)"""
+        signature = self.backend.signature()
+
+        with self._cache_lock:
+            if self._cache is not None and signature == self._cache_signature:
+                self.cache_hits += 1
+                return list(self._cache)
+            self.cache_misses += 1
+
+        history = self.backend.load_all()
+
+        with self._cache_lock:
+            self._cache = history
+            self._cache_signature = signature
+
+        return list(history)
+
+    def cache_stats(self):
+        """History cache hit/miss counters"""
+        total = self.cache_hits + self.cache_misses
+        return {
+            'hits': self.cache_hits,
+            'misses': self.cache_misses,
+            'hit_rate': self.cache_hits / total if total else 0.0
+        }
+
+    def get_recent(self, n=10):
+        """Get N most recent entries"""
+        if n <= 0:
+            return []
+        return self.backend.recent(n)
+
+    def get_range(self, start=None, end=None, analysis_type=None):
+        """
+        Get entries with start <= timestamp <= end, oldest first
+
+        Args:
+            start: datetime or ISO string (default: beginning)
+            end: datetime or ISO string (default: now)
+            analysis_type: Only return entries of this type
+        """
+        return self.backend.range(_to_iso(start), _to_iso(end), analysis_type)
+
+    def get_page(self, page=0, page_size=20, analysis_type=None, start=None, end=None):
+        """Get one page of entries, newest first (page 0 is the newest)"""
+        return self.backend.page(
+            page * page_size,
+            page_size,
+            analysis_type,
+            _to_iso(start),
+            _to_iso(end)
+        )
+
+    def count(self, analysis_type=None, start=None, end=None):
+        """Count entries matching the filters"""
+        return self.backend.count(analysis_type, _to_iso(start), _to_iso(end))
+
+    def get_trend(self, start, end=None, resolution=None):
+        """
+        Get metric trend points (min/avg/max per metric) for a time window
+
+        Args:
+            start: datetime or ISO string
+            end: datetime or ISO string (default: now)
+            resolution: "raw", "hour" or "day" (default: picked from window length)
+        """
+        start = _to_iso(start)
+        end = _to_iso(end) or datetime.now().isoformat()
+
+        if resolution is None:
+            span = datetime.fromisoformat(end) - datetime.fromisoformat(start)
+            if span <= timedelta(days=2):
+                resolution = 'raw'
+            elif span <= timedelta(days=60):
+                resolution = 'hour'
+            else:
+                resolution = 'day'
+
+        if resolution == 'raw':
+            return retention.trend_from_entries(self.backend.range(start, end, None))
+
+        # Long windows read the rollups...
+        rows = {
+            row['bucket']: row
+            for row in self.backend.load_rollups(
+                resolution,
+                retention.bucket_of(start, resolution),
+                end
+            )
+        }
+
+        # ...plus the few raw entries that haven't been rolled up yet
+        watermark = self.backend.rollup_watermark()
+        tail_start = max(start, watermark) if watermark else start
+        recent = self.backend.range(tail_start, end, None)
+        for bucket, row in retention.build_rollups(recent, resolution).items():
+            rows[bucket] = retention.merge_rollup(rows[bucket], row) if bucket in rows else row
+
+        return retention.trend_from_rollups(sorted(rows.values(), key=lambda row: row['bucket']))
+
+    def schedule_compaction(self):
+        """Start a background compaction if one is due (never blocks)"""
+        interval = Config.COMPACT_INTERVAL_MINUTES * 60
+        if time.time() - self._last_compaction < interval:
+            return False
+        if self._compact_lock.locked():
+            return False
+
+        self._last_compaction = time.time()
+        threading.Thread(
+            target=self._compact_in_background,
+            name="history-compactor",
+            daemon=True
+        ).start()
+        return True
+
+    def _compact_in_background(self):
+        """Compaction thread body"""
+        try:
+            self.compact()
+        except Exception as e:
+            print(f"❌ History compaction failed: {e}")
+
+    def compact(self, now=None):
+        """Roll up metrics and apply the retention policy"""
+        with self._compact_lock:
+            return retention.compact(self.backend, Config.RETENTION_DAYS, now)
+
+    def clear_history(self):
+        """Clear all history"""
+        with self._cache_lock:
+            self.backend.clear()
+            self._cache = []
+            self._cache_signature = self.backend.signature()
+        return True
+
+
+class JsonlBackend:
+    """Append-only JSON Lines log, one entry per line"""
+
+    def __init__(self, filename, legacy_filename=None):
+        """
+        Initialize backend
+
+        Args:
+            filename: History log, one JSON entry per line
+            legacy_filename: Old JSON array file, imported once if present
+        """
         self.filename = filename
+        self.legacy_filename = legacy_filename
+        self.rollup_filename = os.path.splitext(filename)[0] + ".rollups.json"
+        self.index_filename = os.path.splitext(filename)[0] + ".index.json"
+        self._lock = threading.Lock()
+        self._index_lock = threading.Lock()
+        self._index_cache = (None, {})  # (log identity, {type: {hour: count}})
+        self._rollup_lock = threading.Lock()
+        self._rollup_cache = (None, {})  # (file signature, parsed rollup doc)
         self.ensure_data_dir()
-    
+        self.migrate_legacy()
+
     def ensure_data_dir(self):
         """Create data directory if it doesn't exist"""
-        os.makedirs(os.path.dirname(self.filename), exist_ok=True)
-    
-    def save_analysis(self, analysis_type, report, analysis):
-        """Save an analysis to history"""
-        entry = {
-            'timestamp': datetime.now().isoformat(),
-            'type': analysis_type,
-            'report': report,
-            'analysis': analysis
-        }
-        
-        # Load existing history
-        history = self.load_history()
-        
-        # Add new entry
-        history.append(entry)
-        
-        # Save back
-        with open(self.filename, 'w') as f:
-            json.dump(history, f, indent=2)
-        
-        return True
-    
-    def load_history(self):
-        """Load history from file"""
+        os.makedirs(os.path.dirname(self.filename) or ".", exist_ok=True)
+
+    def migrate_legacy(self):
+        """Import the old JSON array history (runs once, while the log is missing or empty)"""
+        if os.path.exists(self.filename) and os.path.getsize(self.filename) > 0:
+            return 0
+        if not self.legacy_filename or not os.path.exists(self.legacy_filename):
+            return 0
+
+        entries = read_legacy(self.legacy_filename)
+        if entries is None:
+            return 0
+
+        # Write the new log next to the old file, then swap it in
+        temp_name = self.filename + ".tmp"
+        with open(temp_name, 'w', encoding='utf-8') as f:
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_name, self.filename)
+
+        # Keep the old file around, but out of the way
+        os.replace(self.legacy_filename, self.legacy_filename + ".bak")
+        return len(entries)
+
+    def append(self, entries):
+        """Append entries as lines, flushed to disk in one write"""
+        data = "".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries)
+        data = data.encode('utf-8')
+
+        with self._lock:
+            before = self._log_key()
+            with open(self.filename, 'a+b') as f:
+                # Don't glue the new entry onto a torn last line
+                size = f.seek(0, os.SEEK_END)
+                if size:
+                    f.seek(size - 1)
+                    if f.read(1) != b"\n":
+                        data = b"\n" + data
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+
+            self._update_index(before, entries)
+
+    def signature(self):
+        """File identity, size and mtime (changes on every write)"""
+        try:
+            stat = os.stat(self.filename)
+        except OSError:
+            return None
+        return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+    def load_all(self):
+        """Parse every entry in the log"""
         if not os.path.exists(self.filename):
             return []
-        
+
+        history = []
         try:
-            with open(self.filename, 'r') as f:
-                return json.load(f)
-        except:
+            with open(self.filename, 'rb') as f:
+                for line in f:
+                    entry = parse_line(line)
+                    if entry is not None:
+                        history.append(entry)
+        except OSError:
+            return []
+
+        return history
+
+    def recent(self, n):
+        """Get the last n entries (reads backwards from the end)"""
+        if not os.path.exists(self.filename):
+            return []
+
+        recent = []
+        for entry in self._iter_entries_reversed():
+            recent.append(entry)
+            if len(recent) == n:
+                break
+
+        recent.reverse()
+        return recent
+
+    def range(self, start, end, analysis_type):
+        """Get entries in a time range, oldest first"""
+        if not os.path.exists(self.filename):
             return []
-    
-    def get_recent(self, n=10):
-        """Get N most recent entries"""
-        history = self.load_history()
-        return history[-n:] if history else []
-    
-    def clear_history(self):
-        """Clear all history"""
-        with open(self.filename, 'w') as f:
-            json.dump([], f)
-        return True
+
+        entries = []
+        with open(self.filename, 'rb') as f:
+            if start:
+                self._seek_to_time(f, start)
+
+            for line in f:
+                entry = parse_line(line)
+                if entry is None:
+                    continue
+
+                timestamp = entry.get('timestamp', '')
+                if start and timestamp < start:
+                    continue
+                if end and timestamp > end:
+                    break
+                if analysis_type and entry.get('type') != analysis_type:
+                    continue
+                entries.append(entry)
+
+        return entries
+
+    def page(self, offset, limit, analysis_type, start, end):
+        """Get `limit` matching entries after skipping `offset`, newest first"""
+        if not os.path.exists(self.filename):
+            return []
+
+        # Walk the hours that have matching entries, newest first; whole hours that
+        # fall before the page are skipped by count, only the page's hours are read
+        page = []
+        skipped = 0
+        for hour, count, partial in sorted(self._matching_hours(analysis_type, start, end), reverse=True):
+            if not hour:
+                continue  # no timestamp: can't be located by time
+            if not partial and skipped + count <= offset:
+                skipped += count
+                continue
+
+            first, last = _hour_bounds(hour)
+            entries = self.range(max(start or first, first), min(end or last, last), analysis_type)
+            for entry in reversed(entries):
+                if skipped < offset:
+                    skipped += 1
+                    continue
+                page.append(entry)
+                if len(page) == limit:
+                    return page
+
+        return page
+
+    def count(self, analysis_type, start, end):
+        """Count matching entries (from the hourly index; only partly covered hours are read)"""
+        if not os.path.exists(self.filename):
+            return 0
+
+        total = 0
+        for hour, count, partial in self._matching_hours(analysis_type, start, end):
+            if partial:
+                first, last = _hour_bounds(hour)
+                count = len(self.range(max(start or first, first), min(end or last, last), analysis_type))
+            total += count
+        return total
+
+    def clear(self):
+        """Remove all entries and rollups"""
+        with self._lock:
+            with open(self.filename, 'w') as f:
+                f.flush()
+                os.fsync(f.fileno())
+
+        with self._rollup_lock:
+            if os.path.exists(self.rollup_filename):
+                os.remove(self.rollup_filename)
+
+        with self._index_lock:
+            key = self._log_key()
+            self._save_index(key, {})
+            self._index_cache = (key, {})
+
+    def delete_before(self, cutoff):
+        """Drop entries older than cutoff by rewriting the log (appends keep working)"""
+        if not os.path.exists(self.filename):
+            return 0
+
+        temp_name = self.filename + ".compact"
+        with open(self.filename, 'rb') as src:
+            keep_from = self._offset_of_time(src, cutoff)
+            if keep_from == 0:
+                return 0
+
+            # Copy the kept part without holding the write lock
+            with open(temp_name, 'wb') as dst:
+                src.seek(keep_from)
+                shutil.copyfileobj(src, dst)
+            copied = src.tell()
+
+        with self._lock:
+            # Catch up on lines appended meanwhile
+            with open(self.filename, 'rb') as src, open(temp_name, 'ab') as dst:
+                src.seek(copied)
+                shutil.copyfileobj(src, dst)
+                dst.flush()
+                os.fsync(dst.fileno())
+
+            # Swap only once both files are closed (Windows can't replace an open file)
+            before = self._log_key()
+            os.replace(temp_name, self.filename)
+            self._trim_index(before, cutoff)
+
+        return keep_from
+
+    def rollup_watermark(self):
+        """Timestamp up to which entries have been rolled up (None if never)"""
+        return self._load_rollup_doc().get('rolled_until')
+
+    def load_rollups(self, resolution, start, end):
+        """Get rollup rows of one resolution with start <= bucket <= end"""
+        rows = [
+            row for row in self._load_rollup_doc().get('rows', [])
+            if row['resolution'] == resolution
+            and (not start or row['bucket'] >= start)
+            and (not end or row['bucket'] <= end)
+        ]
+        rows.sort(key=lambda row: row['bucket'])
+        return rows
+
+    def save_rollups(self, rows, rolled_until):
+        """Merge rollup rows into the rollup file and move the watermark"""
+        with self._rollup_lock:
+            doc = self._load_rollup_doc()
+            existing = {(row['resolution'], row['bucket']): row for row in doc.get('rows', [])}
+
+            for row in rows:
+                key = (row['resolution'], row['bucket'])
+                existing[key] = retention.merge_rollup(existing[key], row) if key in existing else row
+
+            doc = {'rolled_until': rolled_until, 'rows': list(existing.values())}
+
+            temp_name = self.rollup_filename + ".tmp"
+            with open(temp_name, 'w', encoding='utf-8') as f:
+                json.dump(doc, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_name, self.rollup_filename)
+
+    def _load_rollup_doc(self):
+        """Read the rollup file ({} if missing), reusing the last parse while the file is unchanged"""
+        try:
+            stat = os.stat(self.rollup_filename)
+        except OSError:
+            return {}
+
+        signature = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        cached_signature, doc = self._rollup_cache
+        if signature == cached_signature:
+            return doc
+
+        try:
+            with open(self.rollup_filename, 'r', encoding='utf-8') as f:
+                doc = json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+        self._rollup_cache = (signature, doc)
+        return doc
+
+    def _matching_hours(self, analysis_type, start, end):
+        """(hour, count, partly inside the window) for every hour with entries in [start, end]"""
+        index = self._load_index()
+        if analysis_type:
+            counts = index.get(analysis_type, {})
+        else:
+            counts = {}
+            for hours in index.values():
+                for hour, count in hours.items():
+                    counts[hour] = counts.get(hour, 0) + count
+
+        matching = []
+        for hour, count in counts.items():
+            if not hour:
+                # Entries without a timestamp only match unfiltered queries
+                if not (start or end):
+                    matching.append((hour, count, False))
+                continue
+
+            first, last = _hour_bounds(hour)
+            if (start and last < start) or (end and first > end):
+                continue
+            partial = bool((start and first < start) or (end and last > end))
+            matching.append((hour, count, partial))
+
+        return matching
+
+    def _log_key(self):
+        """Identity of the log file the index must match (None if missing)"""
+        try:
+            stat = os.stat(self.filename)
+        except OSError:
+            return None
+        return [stat.st_ino, stat.st_size]
+
+    def _load_index(self):
+        """Entry counts per type and hour ({type: {hour: count}}), rebuilt if out of step with the log"""
+        key = self._log_key()
+        if key is None:
+            return {}
+
+        with self._index_lock:
+            cached_key, index = self._index_cache
+            if cached_key == key:
+                return index
+
+            doc = self._read_index_file()
+            if doc.get('log') == key:
+                index = doc['types']
+            else:
+                # Missing, or written for another version of the log: count once
+                index = self._count_hours(self.range(None, None, None))
+                self._save_index(key, index)
+
+            self._index_cache = (key, index)
+            return index
+
+    def _update_index(self, before, entries):
+        """Add appended entries to the index (called under the write lock)"""
+        with self._index_lock:
+            cached_key, index = self._index_cache
+            if cached_key != before:
+                doc = self._read_index_file()
+                if doc.get('log') != before:
+                    # Index was already stale; the next read rebuilds it
+                    self._index_cache = (None, {})
+                    return
+                index = doc['types']
+
+            # Copy on write: readers may be iterating the current dicts
+            index = {analysis_type: dict(hours) for analysis_type, hours in index.items()}
+            for analysis_type, hours in self._count_hours(entries).items():
+                counts = index.setdefault(analysis_type, {})
+                for hour, count in hours.items():
+                    counts[hour] = counts.get(hour, 0) + count
+
+            key = self._log_key()
+            self._save_index(key, index)
+            self._index_cache = (key, index)
+
+    def _trim_index(self, before, cutoff):
+        """Drop index hours before cutoff and recount the hour it falls in (after delete_before)"""
+        with self._index_lock:
+            cached_key, index = self._index_cache
+            if cached_key != before:
+                self._index_cache = (None, {})
+                return
+
+            hour = cutoff[:13]
+            first, last = _hour_bounds(hour)
+            index = {
+                analysis_type: {h: count for h, count in hours.items() if h > hour}
+                for analysis_type, hours in index.items()
+            }
+            for analysis_type, hours in self._count_hours(self.range(first, last, None)).items():
+                index.setdefault(analysis_type, {}).update(hours)
+
+            key = self._log_key()
+            self._save_index(key, index)
+            self._index_cache = (key, index)
+
+    @staticmethod
+    def _count_hours(entries):
+        """{type: {hour: count}} of some entries"""
+        index = {}
+        for entry in entries:
+            hours = index.setdefault(entry.get('type', 'system'), {})
+            hour = entry.get('timestamp', '')[:13]
+            hours[hour] = hours.get(hour, 0) + 1
+        return index
+
+    def _read_index_file(self):
+        """Read the index file ({} if missing or unreadable)"""
+        try:
+            with open(self.index_filename, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self, key, index):
+        """Write the index file atomically (a failed write only costs a rebuild later)"""
+        temp_name = f"{self.index_filename}.{os.getpid()}.tmp"
+        try:
+            with open(temp_name, 'w', encoding='utf-8') as f:
+                json.dump({'log': key, 'types': index}, f)
+            os.replace(temp_name, self.index_filename)
+        except OSError as e:
+            print(f"❌ Could not save history index: {e}")
+
+    def _offset_of_time(self, f, cutoff):
+        """Byte offset of the first entry with timestamp >= cutoff"""
+        self._seek_to_time(f, cutoff)
+
+        while True:
+            position = f.tell()
+            line = f.readline()
+            if not line:
+                return position
+
+            entry = parse_line(line)
+            if entry is not None and entry.get('timestamp', '') >= cutoff:
+                return position
+
+    def _iter_entries_reversed(self):
+        """Yield parsed entries from newest to oldest"""
+        for line in self._iter_lines_reversed():
+            entry = parse_line(line)
+            if entry is not None:
+                yield entry
+
+    def _iter_lines_reversed(self):
+        """Yield raw log lines from last to first, one block at a time"""
+        with open(self.filename, 'rb') as f:
+            position = f.seek(0, os.SEEK_END)
+            remainder = b""
+
+            while position > 0:
+                step = min(TAIL_BLOCK_SIZE, position)
+                position -= step
+                f.seek(position)
+
+                lines = (f.read(step) + remainder).split(b"\n")
+                # First piece may be the tail of an earlier line
+                remainder = lines.pop(0)
+
+                for line in reversed(lines):
+                    yield line
+
+            yield remainder
+
+    def _seek_to_time(self, f, start):
+        """Binary search the (time-ordered) log for the first entry >= start"""
+        low = 0
+        high = f.seek(0, os.SEEK_END)
+
+        while high - low > TAIL_BLOCK_SIZE:
+            middle = (low + high) // 2
+            f.seek(middle)
+            f.readline()  # skip partial line
+
+            # First whole entry after the middle point
+            entry = None
+            for line in f:
+                entry = parse_line(line)
+                if entry is not None:
+                    break
+
+            if entry is None or entry.get('timestamp', '') >= start:
+                high = middle
+            else:
+                low = middle
+
+        f.seek(low)
+        if low:
+            f.readline()
+
+
+def make_entry(analysis_type, report, analysis, metrics=None, timestamp=None, llm=None):
+    """Build a history entry dict"""
+    entry = {
+        'timestamp': _to_iso(timestamp) or datetime.now().isoformat(),
+        'type': analysis_type,
+        'report': report,
+        'analysis': analysis
+    }
+
+    if metrics is not None:
+        entry['metrics'] = metrics
+    if llm:
+        entry['llm'] = llm
+
+    return entry
+
+
+def _hour_bounds(hour):
+    """First and last possible timestamp of an hour ("YYYY-MM-DDTHH")"""
+    return hour + ":00:00", hour + ":59:59.999999"
+
+
+def parse_line(line):
+    """Parse one log line (None for blank or torn lines)"""
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        return json.loads(line)
+    except ValueError:
+        # Partial line left behind by a crash mid-append
+        return None
+
+
+def read_legacy(filename):
+    """Read an old history file (JSON array or JSON Lines), None on failure"""
+    try:
+        with open(filename, 'rb') as f:
+            data = f.read()
+    except OSError as e:
+        print(f"❌ Could not read {filename}: {e}")
+        return None
+
+    if data.lstrip().startswith(b"["):
+        try:
+            return json.loads(data)
+        except ValueError as e:
+            print(f"❌ Could not migrate {filename}: {e}")
+            return None
+
+    entries = (parse_line(line) for line in data.splitlines())
+    return [entry for entry in entries if entry is not None]
+
+
+def _to_iso(value):
+    """Turn a datetime into the ISO string used for timestamps"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
 
 # Test
 if __name__ == "__main__":
     print("\n" + "="*50)
     print("Storage System Test")
     print("="*50 + "\n")
-    
+
     storage = Storage()
-    
+
     # Save a test entry
     storage.save_analysis(
         "system",
         "CPU: 25%, RAM: 50%, Disk: 80%",
-        "Status: Good. No issues detected."
+        "Status: Good. No issues detected.",
+        metrics={'cpu_percent': 25.0, 'mem_percent': 50.0, 'disk_percent': 80.0}
     )
-    
+
     # Load history
     history = storage.load_history()
     print(f"✅ Saved {len(history)} entries")
-    
+
     # Show recent
     recent = storage.get_recent(5)
     print(f"✅ Loaded {len(recent)} recent entries")
-    
+
     print("\n✅ Storage system working!\n")
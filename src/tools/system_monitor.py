@@ -1,46 +1,396 @@
 # src/tools/system_monitor.py
 
-import psutil
+import os
+import sys
+import threading
+import time
+from collections import deque
 from datetime import datetime
 
-def get_system_report():
-    """Get PC health metrics"""
-    
-    # Get CPU usage
-    cpu = psutil.cpu_percent(interval=1)
-    
-    # Get memory info
+import psutil
+
+# Run directly (python src/tools/...): make config and tools importable
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from tools.process_monitor import format_processes, get_process_collector
+
+# How long the sampler measures CPU before its very first reading
+FIRST_SAMPLE_DELAY = 0.25
+
+
+class MetricSnapshot:
+    """One system reading, stored as plain numbers"""
+
+    __slots__ = (
+        'timestamp',
+        'cpu_percent',
+        'mem_used',
+        'mem_total',
+        'mem_percent',
+        'disk_used',
+        'disk_total',
+        'disk_percent',
+        'cpu_per_core',
+        'cpu_max_core',
+        'partitions',
+        'disk_read_rate',
+        'disk_write_rate',
+        'net_sent_rate',
+        'net_recv_rate'
+    )
+
+    def __init__(self, timestamp, cpu_percent, mem_used, mem_total, mem_percent,
+                 disk_used, disk_total, disk_percent, cpu_per_core=None, cpu_max_core=None,
+                 partitions=None, disk_read_rate=None, disk_write_rate=None,
+                 net_sent_rate=None, net_recv_rate=None):
+        """
+        Initialize snapshot
+
+        Args:
+            timestamp: Unix time of the reading
+            cpu_percent: CPU usage (%)
+            mem_used / mem_total: Memory in bytes
+            mem_percent: Memory usage (%)
+            disk_used / disk_total: Disk space in bytes (root partition)
+            disk_percent: Disk usage (%) (root partition)
+            cpu_per_core: Usage of each core (%)
+            cpu_max_core: Usage of the busiest core (%)
+            partitions: dicts with mountpoint, used, total and percent for every mounted disk
+            disk_read_rate / disk_write_rate: Disk throughput in bytes/s (None on the first reading)
+            net_sent_rate / net_recv_rate: Network throughput in bytes/s (None on the first reading)
+        """
+        self.timestamp = timestamp
+        self.cpu_percent = cpu_percent
+        self.mem_used = mem_used
+        self.mem_total = mem_total
+        self.mem_percent = mem_percent
+        self.disk_used = disk_used
+        self.disk_total = disk_total
+        self.disk_percent = disk_percent
+        self.cpu_per_core = cpu_per_core or []
+        self.cpu_max_core = cpu_max_core
+        self.partitions = partitions or []
+        self.disk_read_rate = disk_read_rate
+        self.disk_write_rate = disk_write_rate
+        self.net_sent_rate = net_sent_rate
+        self.net_recv_rate = net_recv_rate
+
+    @property
+    def taken_at(self):
+        """Reading time as a datetime"""
+        return datetime.fromtimestamp(self.timestamp)
+
+    def to_dict(self):
+        """Convert to a JSON-friendly dict"""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a snapshot from a dict made by to_dict() (older dicts lack the newer fields)"""
+        return cls(**{name: data[name] for name in cls.__slots__ if name in data})
+
+    def __repr__(self):
+        return (f"MetricSnapshot(cpu={self.cpu_percent}%, "
+                f"mem={self.mem_percent}%, disk={self.disk_percent}%)")
+
+
+class CounterRates:
+    """Disk and network throughput from psutil's cumulative counters (change since the previous call)"""
+
+    def __init__(self):
+        self._previous = None  # (time, disk read, disk written, net sent, net received)
+        self._lock = threading.Lock()
+
+    def update(self):
+        """
+        Read the counters once
+
+        Returns:
+            dict of disk_read_rate, disk_write_rate, net_sent_rate, net_recv_rate in bytes/s
+            (all None on the first call)
+        """
+        disk = psutil.disk_io_counters()
+        net = psutil.net_io_counters()
+        current = (
+            time.monotonic(),
+            disk.read_bytes if disk else 0,
+            disk.write_bytes if disk else 0,
+            net.bytes_sent if net else 0,
+            net.bytes_recv if net else 0
+        )
+
+        with self._lock:
+            previous, self._previous = self._previous, current
+
+        names = ('disk_read_rate', 'disk_write_rate', 'net_sent_rate', 'net_recv_rate')
+        elapsed = current[0] - previous[0] if previous else 0
+        if elapsed <= 0:
+            return dict.fromkeys(names)
+
+        # Counters can wrap or reset (e.g. a NIC going away); never report negative rates
+        return {
+            name: max(now - before, 0) / elapsed
+            for name, now, before in zip(names, current[1:], previous[1:])
+        }
+
+
+def read_partitions():
+    """Usage of every mounted disk partition (one entry per device)"""
+    partitions = []
+    seen = set()
+
+    for part in psutil.disk_partitions(all=False):
+        if part.device in seen or 'cdrom' in part.opts or part.fstype in ('squashfs', ''):
+            continue
+        try:
+            usage = psutil.disk_usage(part.mountpoint)
+        except OSError:
+            continue
+        seen.add(part.device)
+        partitions.append({
+            'mountpoint': part.mountpoint,
+            'used': usage.used,
+            'total': usage.total,
+            'percent': usage.percent
+        })
+
+    return partitions
+
+
+# Counters shared by every reading in this process
+_rates = CounterRates()
+
+
+def take_reading():
+    """Take one non-blocking psutil reading"""
+
+    # CPU usage since the previous call (never sleeps)
+    cpu = psutil.cpu_percent(interval=None)
+    cores = psutil.cpu_percent(interval=None, percpu=True)
     memory = psutil.virtual_memory()
-    mem_used = round(memory.used / (1024**3), 1)  # GB
-    mem_total = round(memory.total / (1024**3), 1)  # GB
-    mem_percent = memory.percent
-    
-    # Get disk info
     disk = psutil.disk_usage('/')
-    disk_used = round(disk.used / (1024**3), 1)  # GB
-    disk_total = round(disk.total / (1024**3), 1)  # GB
-    disk_percent = disk.percent
-    
+
+    return MetricSnapshot(
+        timestamp=time.time(),
+        cpu_percent=cpu,
+        mem_used=memory.used,
+        mem_total=memory.total,
+        mem_percent=memory.percent,
+        disk_used=disk.used,
+        disk_total=disk.total,
+        disk_percent=disk.percent,
+        cpu_per_core=cores,
+        cpu_max_core=max(cores) if cores else cpu,
+        partitions=read_partitions(),
+        **_rates.update()
+    )
+
+
+class MetricsSampler:
+    """Background thread that keeps recent psutil readings in a ring buffer"""
+
+    def __init__(self, interval=None, buffer_size=None):
+        """
+        Initialize sampler
+
+        Args:
+            interval: Seconds between readings (default: Config)
+            buffer_size: Number of readings kept (default: Config)
+        """
+        self.interval = interval or Config.SAMPLE_INTERVAL_SECONDS
+        self.readings = deque(maxlen=buffer_size or Config.SAMPLE_BUFFER_SIZE)
+        self._thread = None
+        self.listeners = []
+        self._stop = threading.Event()
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the sampler thread (no-op if already running)"""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return self
+
+            # Prime the CPU and I/O counters so the first reading covers a real interval
+            psutil.cpu_percent(interval=None)
+            psutil.cpu_percent(interval=None, percpu=True)
+            _rates.update()
+
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run,
+                name="metrics-sampler",
+                daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def add_listener(self, callback):
+        """Call callback(snapshot) for every new reading (runs on the sampler thread)"""
+        if callback not in self.listeners:
+            self.listeners.append(callback)
+
+    def stop(self):
+        """Stop the sampler thread"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval + 1)
+
+    def is_running(self):
+        """Check if the sampler thread is alive"""
+        return bool(self._thread and self._thread.is_alive())
+
+    def _run(self):
+        """Sampler loop"""
+        self._stop.wait(FIRST_SAMPLE_DELAY)
+
+        while not self._stop.is_set():
+            try:
+                snapshot = take_reading()
+                self.readings.append(snapshot)
+                self._ready.set()
+
+                for callback in self.listeners:
+                    callback(snapshot)
+            except Exception as e:
+                print(f"❌ Sampler error: {e}")
+
+            self._stop.wait(self.interval)
+
+    def latest(self, timeout=2.0):
+        """Get the newest reading (waits only until the first one exists)"""
+        if not self.readings:
+            self._ready.wait(timeout)
+
+        try:
+            return self.readings[-1]
+        except IndexError:
+            # Sampler not producing yet - read directly, still non-blocking
+            return take_reading()
+
+    def history(self):
+        """Get all buffered readings, oldest first"""
+        return list(self.readings)
+
+
+# One sampler per process
+_sampler = None
+_sampler_lock = threading.Lock()
+
+
+def get_sampler():
+    """Get the process-wide sampler, starting it on first use"""
+    global _sampler
+
+    with _sampler_lock:
+        if _sampler is None:
+            _sampler = MetricsSampler()
+            # Process ranking refreshes in the background, every few readings
+            collector = get_process_collector()
+            collector.collect()
+            _sampler.add_listener(collector.on_reading)
+        _sampler.start()
+
+    return _sampler
+
+
+def get_snapshot():
+    """Get the latest system reading as a MetricSnapshot"""
+    return get_sampler().latest()
+
+
+def get_top_processes():
+    """Get the newest top-N process ranking (collected on the sampler thread)"""
+    get_sampler()
+    return get_process_collector().latest()
+
+
+def format_rate(bytes_per_second):
+    """Throughput as text (KB/s or MB/s)"""
+    if bytes_per_second >= 1024**2:
+        return f"{bytes_per_second / (1024**2):.1f} MB/s"
+    return f"{bytes_per_second / 1024:.0f} KB/s"
+
+
+def format_details(snapshot):
+    """Report lines for cores, extra partitions and throughput (skipped when not measured)"""
+    lines = []
+
+    cores = snapshot.cpu_per_core
+    if len(cores) > 1:
+        busiest = max(range(len(cores)), key=cores.__getitem__)
+        lines.append(f"CPU cores: {len(cores)}, busiest core {busiest} at {cores[busiest]}%, "
+                     f"{sum(1 for c in cores if c >= 90)} above 90%")
+
+    others = [p for p in snapshot.partitions if p['mountpoint'] != '/']
+    if others:
+        lines.append("Other disks: " + ", ".join(
+            f"{p['mountpoint']} {p['used'] / (1024**3):.1f} / {p['total'] / (1024**3):.1f} GB ({p['percent']}%)"
+            for p in others))
+
+    if snapshot.disk_read_rate is not None:
+        lines.append(f"Disk I/O: read {format_rate(snapshot.disk_read_rate)}, "
+                     f"write {format_rate(snapshot.disk_write_rate)}")
+    if snapshot.net_recv_rate is not None:
+        lines.append(f"Network: down {format_rate(snapshot.net_recv_rate)}, "
+                     f"up {format_rate(snapshot.net_sent_rate)}")
+
+    return "\n".join(lines)
+
+
+def format_report(snapshot, processes=None):
+    """Render a snapshot (and optionally a process ranking) as the text health report"""
+
+    # Memory info
+    mem_used = round(snapshot.mem_used / (1024**3), 1)  # GB
+    mem_total = round(snapshot.mem_total / (1024**3), 1)  # GB
+
+    # Disk info
+    disk_used = round(snapshot.disk_used / (1024**3), 1)  # GB
+    disk_total = round(snapshot.disk_total / (1024**3), 1)  # GB
+
     # Create report
     report = f"""
-PC Health Report - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+PC Health Report - {snapshot.taken_at.strftime('%Y-%m-%d %H:%M:%S')}
 
-CPU Usage: {cpu}%
-Memory: {mem_used} GB / {mem_total} GB ({mem_percent}%)
-Disk: {disk_used} GB / {disk_total} GB ({disk_percent}%)
+CPU Usage: {snapshot.cpu_percent}%
+Memory: {mem_used} GB / {mem_total} GB ({snapshot.mem_percent}%)
+Disk: {disk_used} GB / {disk_total} GB ({snapshot.disk_percent}%)
 """
-    
-    return report.strip()
+    report = report.strip()
+
+    details = format_details(snapshot)
+    if details:
+        report += "\n" + details
+
+    # Which processes are behind the numbers
+    if processes:
+        report += "\n\n" + format_processes(processes)
+
+    return report
+
+
+def get_system_report():
+    """Get PC health metrics"""
+    return format_report(get_snapshot(), get_top_processes())
 
 # Test it
 if __name__ == "__main__":
     print("\n" + "="*50)
     print("System Monitor Test")
     print("="*50 + "\n")
-    
+
     report = get_system_report()
     print(report)
-    
+
+    # Second call is served straight from the ring buffer
+    start = time.perf_counter()
+    get_system_report()
+    elapsed_us = (time.perf_counter() - start) * 1e6
+    print(f"\nCached report took {elapsed_us:.0f} µs")
+
     print("\n" + "="*50)
     print("✅ System monitor working!")
     print("="*50 + "\n")
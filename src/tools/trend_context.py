@@ -0,0 +1,216 @@
+# src/tools/trend_context.py - Compress history into a fixed-size text block for the AI prompt
+
+import math
+import os
+import sys
+from datetime import datetime, timedelta
+
+import numpy as np
+
+# Run directly (python src/tools/...): make config and tools importable
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from tools.health_rules import thresholds
+from tools.retention import ROLLUP_METRICS
+
+LABELS = {'cpu_percent': "CPU", 'mem_percent': "Memory", 'disk_percent': "Disk"}
+
+
+def estimate_tokens(text):
+    """Rough token count (about 4 characters per token for English and numbers)"""
+    return math.ceil(len(text) / 4)
+
+
+def downsample(values, points):
+    """Average neighbouring values down to at most POINTS values"""
+    if len(values) <= points:
+        return list(values)
+    return [float(np.mean(chunk)) for chunk in np.array_split(np.array(values, dtype=float), points)]
+
+
+def build_trend_context(storage, now=None, budget_tokens=None, archive=None, days=7):
+    """
+    Summarize recent history for the AI prompt, within a token budget
+
+    Reads only hourly/daily rollups (plus the un-rolled tail), so the cost and the
+    size of the result don't grow with the number of stored checks. Only complete
+    hours are used: the text stays the same until the next hour starts, so saving a
+    check doesn't change the prompt (and the LLM cache key) of the next one.
+
+    Args:
+        storage: Storage to read trends from
+        now: End of the window, rounded down to the hour (default: datetime.now())
+        budget_tokens: Most tokens the context may take (default: Config.TREND_CONTEXT_TOKENS)
+        archive: MetricsArchive for exact percentiles (default: estimated from hourly averages)
+        days: Length of the summary window
+
+    Returns:
+        Context text ("" if there is no history with metrics)
+    """
+    now = (now or datetime.now()).replace(minute=0, second=0, microsecond=0)
+    budget_tokens = budget_tokens or Config.TREND_CONTEXT_TOKENS
+    start = now - timedelta(days=days)
+
+    # Up to the start of the current hour (checks saved since then come in next hour)
+    hours = storage.get_trend(start, now - timedelta(microseconds=1), resolution='hour')
+    if not hours:
+        return ""
+
+    checks = sum(point['count'] for point in hours)
+    summary = [f"History (last {days} days to {now:%H:00}, {checks} checks):"]
+    for name in ROLLUP_METRICS:
+        line = _summary_line(name, hours, archive, start, now)
+        if line:
+            summary.append(line)
+
+    anomalies = find_anomalies(hours)
+
+    # Hourly averages of the last day, daily averages of the whole window
+    last_day = [point for point in hours if point['timestamp'] >= (now - timedelta(days=1)).isoformat()]
+    series = {
+        name: [point[name]['avg'] for point in last_day if name in point]
+        for name in ROLLUP_METRICS
+    }
+    daily = _daily_averages(hours)
+
+    # Shrink the series first, then drop the oldest anomalies, until it fits
+    points = 24
+    while True:
+        text = _render(summary, anomalies, series, daily, points)
+        if estimate_tokens(text) <= budget_tokens:
+            return text
+        if points > 4:
+            points //= 2
+        elif anomalies:
+            anomalies = anomalies[:-1]
+        elif series or daily:
+            series, daily = {}, {}
+        else:
+            return "\n".join(summary)[:budget_tokens * 4]
+
+
+def find_anomalies(hours, limit=5):
+    """Hours whose peak crossed a warning threshold or sat far above normal, newest first"""
+    limits = {field: (good_below, critical_at) for field, _, good_below, critical_at in thresholds()}
+    anomalies = []
+
+    for name in ROLLUP_METRICS:
+        averages = np.array([point[name]['avg'] for point in hours if name in point], dtype=float)
+        if averages.size == 0:
+            continue
+        mean, std = float(averages.mean()), float(averages.std())
+        good_below, critical_at = limits[name]
+
+        for point in hours:
+            stats = point.get(name)
+            if not stats:
+                continue
+            if stats['max'] >= critical_at:
+                level = "critical"
+            elif stats['max'] >= good_below:
+                level = "high"
+            elif std > 0 and stats['avg'] > mean + 3 * std:
+                level = "unusual"
+            else:
+                continue
+            anomalies.append((point['timestamp'], name, level, stats['max']))
+
+    anomalies.sort(reverse=True)
+    return [
+        f"- {timestamp[:16].replace('T', ' ')} {LABELS[name]} {level}, peak {peak:.0f}%"
+        for timestamp, name, level, peak in anomalies[:limit]
+    ]
+
+
+def _summary_line(name, hours, archive, start, end):
+    """min / avg / p95 / max of one metric over the window"""
+    stats = [point[name] for point in hours if name in point]
+    if not stats:
+        return None
+
+    count = sum(s['count'] for s in stats)
+    average = sum(s['avg'] * s['count'] for s in stats) / count
+
+    p95 = None
+    if archive is not None:
+        p95 = archive.aggregate(name, start, end).get('p95')
+    if p95 is None:
+        # Estimate from hourly averages when raw samples aren't available
+        p95 = float(np.percentile([s['avg'] for s in stats], 95))
+
+    return (f"{LABELS[name]} %: min {min(s['min'] for s in stats):.0f} / avg {average:.0f} / "
+            f"p95 {p95:.0f} / max {max(s['max'] for s in stats):.0f}")
+
+
+def _daily_averages(hours):
+    """Daily average of each metric (oldest first)"""
+    days = {}
+    for point in hours:
+        day = days.setdefault(point['timestamp'][:10], {})
+        for name in ROLLUP_METRICS:
+            if name in point:
+                total, count = day.get(name, (0.0, 0))
+                day[name] = (total + point[name]['avg'] * point[name]['count'], count + point[name]['count'])
+
+    return {
+        name: [day[name][0] / day[name][1] for _, day in sorted(days.items()) if name in day]
+        for name in ROLLUP_METRICS
+    }
+
+
+def _series_text(values, points):
+    """Downsampled values, or one number when the series is flat"""
+    if max(values) - min(values) < 1:
+        return f"steady at {values[-1]:.0f}"
+    return " ".join(f"{value:.0f}" for value in downsample(values, points))
+
+
+def _render(summary, anomalies, series, daily, points):
+    """Assemble the context text"""
+    lines = list(summary)
+
+    for name, values in series.items():
+        if values:
+            lines.append(f"{LABELS[name]} % last 24h (oldest→newest): {_series_text(values, points)}")
+
+    for name, values in daily.items():
+        if len(values) > 1:
+            lines.append(f"{LABELS[name]} % daily: {_series_text(values, points)} "
+                         f"({values[-1] - values[0]:+.1f} over the window)")
+
+    if anomalies:
+        lines.append("Recent anomalies:")
+        lines.extend(anomalies)
+
+    return "\n".join(lines)
+
+# Test
+if __name__ == "__main__":
+    import os
+    import tempfile
+
+    from tools.storage import Storage
+
+    print("\n" + "="*50)
+    print("Trend Context Test")
+    print("="*50 + "\n")
+
+    with tempfile.TemporaryDirectory() as folder:
+        storage = Storage(filename=os.path.join(folder, "history.jsonl"), legacy_filename=None)
+        now = datetime.now()
+        storage.save_many([
+            {
+                'timestamp': (now - timedelta(minutes=30 * i)).isoformat(),
+                'report': "", 'analysis': "",
+                'metrics': {'cpu_percent': 20 + (i % 48), 'mem_percent': 55.0, 'disk_percent': 70 - i / 100}
+            }
+            for i in reversed(range(7 * 48))
+        ])
+
+        context = build_trend_context(storage, now=now)
+        print(context)
+        print(f"\n~{estimate_tokens(context)} tokens")
+
+    print("\n✅ Trend context working!\n")
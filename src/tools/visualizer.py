@@ -1,77 +1,199 @@
 # src/tools/visualizer.py
 
+import threading
+from datetime import datetime
+
+import numpy as np
 import plotly.graph_objects as go
 
-def create_gauge_chart(value, title, max_value=100):
-    """Create a gauge chart for a metric"""
-    
-    # Determine color based on value
+# Most points drawn per series; longer series are downsampled first
+MAX_CHART_POINTS = 2000
+
+# Gauge layouts, built once per (title, max_value) and shared by every update
+_gauge_templates = {}
+_gauge_lock = threading.Lock()
+
+
+def gauge_color(value):
+    """Bar colour for a metric value"""
     if value < 50:
-        color = "green"
+        return "green"
     elif value < 80:
-        color = "yellow"
-    else:
-        color = "red"
-    
-    fig = go.Figure(go.Indicator(
-        mode = "gauge+number",
-        value = value,
-        title = {'text': title},
-        gauge = {
-            'axis': {'range': [None, max_value]},
-            'bar': {'color': color},
-            'steps': [
-                {'range': [0, 50], 'color': "lightgray"},
-                {'range': [50, 80], 'color': "gray"},
-                {'range': [80, 100], 'color': "darkgray"}
-            ],
-            'threshold': {
-                'line': {'color': "red", 'width': 4},
-                'thickness': 0.75,
-                'value': 90
-            }
-        }
-    ))
-    
-    fig.update_layout(height=250, margin=dict(l=20, r=20, t=50, b=20))
+        return "yellow"
+    return "red"
+
+
+def _gauge_template(title, max_value):
+    """Full gauge figure as a plain dict (axis, steps, threshold, layout)"""
+    key = (title, max_value)
+    with _gauge_lock:
+        template = _gauge_templates.get(key)
+        if template is None:
+            fig = go.Figure(go.Indicator(
+                mode = "gauge+number",
+                value = 0,
+                title = {'text': title},
+                gauge = {
+                    'axis': {'range': [None, max_value]},
+                    'bar': {'color': "green"},
+                    'steps': [
+                        {'range': [0, 50], 'color': "lightgray"},
+                        {'range': [50, 80], 'color': "gray"},
+                        {'range': [80, 100], 'color': "darkgray"}
+                    ],
+                    'threshold': {
+                        'line': {'color': "red", 'width': 4},
+                        'thickness': 0.75,
+                        'value': 90
+                    }
+                }
+            ))
+            fig.update_layout(height=250, margin=dict(l=20, r=20, t=50, b=20))
+            template = _gauge_templates[key] = fig.to_plotly_json()
+    return template
+
+
+def create_gauge_chart(value, title, max_value=100):
+    """
+    Create a gauge chart for a metric
+
+    Only the value and bar colour are new; everything else comes from the cached template,
+    so the figure is built without re-validating it.
+    """
+    template = _gauge_template(title, max_value)
+    indicator = template['data'][0]
+
+    # Shallow copies: the shared template is never modified
+    gauge = dict(indicator['gauge'], bar={'color': gauge_color(value)})
+    return go.Figure({
+        'data': [dict(indicator, value=value, gauge=gauge)],
+        'layout': template['layout']
+    }, _validate=False)
+
+
+def lttb(x, y, points):
+    """
+    Largest-Triangle-Three-Buckets downsampling (keeps the visual shape of a series)
+
+    Args:
+        x: Sorted x values (e.g. Unix times)
+        y: Values
+        points: Number of points to keep
+
+    Returns:
+        (x, y) NumPy arrays with at most POINTS values
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if points >= x.size or points < 3:
+        return x, y
+
+    # First and last points are always kept; the rest is split into equal buckets
+    edges = np.linspace(1, x.size - 1, points - 1).astype(int)
+    keep = np.empty(points, dtype=int)
+    keep[0] = 0
+    keep[-1] = x.size - 1
+
+    previous = 0
+    for i in range(points - 2):
+        start, end = edges[i], edges[i + 1]
+
+        # Average of the next bucket is the third corner of the triangle
+        next_end = edges[i + 2] if i + 2 < len(edges) else x.size
+        next_x = x[end:next_end].mean()
+        next_y = y[end:next_end].mean()
+
+        # Pick the point in this bucket with the largest triangle area
+        area = np.abs(
+            (x[previous] - next_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (next_y - y[previous])
+        )
+        previous = keep[i + 1] = start + int(np.argmax(area))
+
+    return x[keep], y[keep]
+
+
+def minmax_buckets(x, y, points):
+    """
+    Min/max bucketing: the lowest and highest point of every bucket (keeps every spike)
+
+    Returns:
+        (x, y) NumPy arrays with at most POINTS values
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if points >= x.size or points < 2:
+        return x, y
+
+    buckets = points // 2
+    starts = np.linspace(0, x.size, buckets, endpoint=False).astype(int)
+    lows = np.minimum.reduceat(y, starts)
+    highs = np.maximum.reduceat(y, starts)
+
+    # Index of the first min/max inside each bucket, kept in time order
+    bucket_of = np.repeat(np.arange(buckets), np.diff(np.append(starts, x.size)))
+    low_index = np.flatnonzero(y == lows[bucket_of])
+    high_index = np.flatnonzero(y == highs[bucket_of])
+    low_index = low_index[np.unique(bucket_of[low_index], return_index=True)[1]]
+    high_index = high_index[np.unique(bucket_of[high_index], return_index=True)[1]]
+
+    keep = np.unique(np.concatenate([low_index, high_index]))
+    return x[keep], y[keep]
+
+
+def create_timeseries_chart(timestamps, series, title="", max_points=MAX_CHART_POINTS, method="lttb"):
+    """
+    Line chart of metric series, downsampled before plotting
+
+    Args:
+        timestamps: Unix times, sorted
+        series: dict of name -> values (same length as timestamps)
+        title: Chart title
+        max_points: Most points drawn per series
+        method: "lttb" (shape) or "minmax" (every spike)
+    """
+    downsample = minmax_buckets if method == "minmax" else lttb
+    timestamps = np.asarray(timestamps, dtype=float)
+
+    fig = go.Figure()
+    for name, values in series.items():
+        x, y = downsample(timestamps, values, max_points)
+        fig.add_trace(go.Scattergl(
+            x=[datetime.fromtimestamp(t) for t in x],  # local time, like the rest of the dashboard
+            y=y,
+            mode="lines",
+            name=name
+        ))
+
+    fig.update_layout(
+        title=title,
+        height=300,
+        margin=dict(l=20, r=20, t=50 if title else 20, b=20),
+        yaxis={'range': [0, 100], 'title': "%"},
+        legend={'orientation': "h"}
+    )
     return fig
 
 # Test
 if __name__ == "__main__":
-    print("\n✅ Visualizer created!")
+    import time
+
+    print("\n" + "="*50)
+    print("Visualizer Test")
+    print("="*50 + "\n")
+
+    create_gauge_chart(0, "CPU")
+    start = time.perf_counter()
+    for value in range(1000):
+        create_gauge_chart(value % 100, "CPU")
+    print(f"Gauge update: {(time.perf_counter() - start) * 1000:.3f} µs")
+
+    count = 525_600  # a year of per-minute samples
+    timestamps = time.time() - np.arange(count)[::-1] * 60.0
+    cpu = (np.sin(np.arange(count) / 500) + 1) * 40 + np.random.default_rng(0).random(count) * 20
+    start = time.perf_counter()
+    fig = create_timeseries_chart(timestamps, {'CPU %': cpu})
+    print(f"Year of samples: {count:,} -> {len(fig.data[0].y):,} points in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    print("\n✅ Visualizer working!")
     print("Use in Streamlit with: st.plotly_chart(fig)\n")
-```
-
-Now you can add charts to your dashboard! (I'll show you how if you want)
-
----
-
-## ✅ What You've Built So Far
-
-### **Core Features:**
-- ✅ System health monitoring (CPU, RAM, Disk)
-- ✅ AI-powered analysis and recommendations
-- ✅ History tracking (saves all checks)
-- ✅ Modern tabbed interface
-- ✅ Configuration system (.env)
-- ✅ Local storage (JSON)
-
-### **File Structure:**
-```
-ai-pc-assistant/
-├── .env                    (your settings)
-├── venv/                   (Python environment)
-├── src/
-│   ├── config.py          (configuration loader)
-│   ├── tools/
-│   │   ├── system_monitor.py    (PC health checker)
-│   │   ├── storage.py           (save history)
-│   │   ├── email_checker.py     (email placeholder)
-│   │   └── visualizer.py        (charts - optional)
-│   └── llm/               (empty for now)
-├── data/
-│   └── history.json       (saved analyses)
-├── test.py                (connection test)
-├── main.py                (CLI version)
-├── dashboard.py           (simple dashboard)
-└── dashboard_v2.py        (enhanced dashboard) ⭐
@@ -1,32 +1,30 @@
 # test.py - FIXED VERSION
 
-from openai import OpenAI
+import sys
+sys.path.append('src')
+
+from tools.llm_service import get_analysis_service
 
 print("\n" + "="*50)
 print("Testing LM Studio Connection")
 print("="*50 + "\n")
 
-# Connect to LM Studio
-client = OpenAI(
-    base_url="http://localhost:1234/v1",
-    api_key="not-needed"
-)
+# Connect to LM Studio (same client, timeouts and retries as the app)
+service = get_analysis_service()
 
 # Send a simple test - NO SYSTEM MESSAGE
 print("Sending message to AI...")
 
-response = client.chat.completions.create(
-    model="local-model",  # Just use "local-model" as placeholder
-    messages=[
+answer = service.complete(
+    [
         {"role": "user", "content": "Say hello in one sentence."}
         # ☝️ Only user role - no system role!
     ],
+    use_cache=False,  # always ask the server
     temperature=0.7,
     max_tokens=50
 )
 
-answer = response.choices[0].message.content
-
 print("\n✅ Success!")
 print(f"AI said: {answer}\n")
 print("="*50)